@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from passlib.hash import sha256_crypt
+from pymongo.errors import DuplicateKeyError
 from db_utils.get_connection import get_collection  # type: ignore
+from app.utils.password_utils import hash_password, verify_password
+from app.utils.auth_utils import issue_token, AUTH_TOKEN_TTL_SECONDS
 
 router = APIRouter()
 
@@ -29,8 +31,8 @@ async def signup(data: SignupRequest):
             detail="Email already registered"
         )
 
-    # ✅ SAFE HASH (NO BCRYPT)
-    hashed_password = sha256_crypt.hash(data.password)
+    # ✅ SAFE HASH (NO BCRYPT), off the event loop
+    hashed_password = await hash_password(data.password)
 
     user = {
         "email": data.email,
@@ -38,11 +40,18 @@ async def signup(data: SignupRequest):
         "created_at": datetime.utcnow()
     }
 
-    result = await users.insert_one(user)
+    try:
+        result = await users.insert_one(user)
+    except DuplicateKeyError:
+        # A concurrent signup for the same email got past the check first
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     user_id = result.inserted_id
 
     await finances.insert_one({
-        "user_id": str(user_id),
+        "user_id": user_id,
         "user_monthly_expenditure": 1000
     })
 
@@ -64,14 +73,22 @@ async def login(data: LoginRequest):
             detail="User not found"
         )
 
-    if not sha256_crypt.verify(data.password, user["password"]):
+    valid, new_hash = await verify_password(data.password, user["password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
         )
 
+    # Transparently upgrade hashes made under an older scheme / rounds policy
+    if new_hash:
+        await users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+
     return {
         "message": "Login successful",
         "email": user["email"],
-        "user_id": str(user["_id"])
+        "user_id": str(user["_id"]),
+        "access_token": issue_token(str(user["_id"])),
+        "token_type": "bearer",
+        "expires_in": AUTH_TOKEN_TTL_SECONDS
     }
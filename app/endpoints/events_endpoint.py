@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.utils.auth_utils import get_current_user_id, verify_token
+from app.utils.events_utils import change_feed, get_change_feed_stats
+
+router = APIRouter()
+
+
+# -------------------- AUTH --------------------
+# EventSource can't set headers, so the token may also come as ?access_token=
+async def get_stream_user_id(
+    request: Request,
+    access_token: Optional[str] = None,
+    authorization: str = Header(None),
+    user_id: str = Header(None)
+) -> str:
+    if access_token:
+        return verify_token(access_token)
+    return await get_current_user_id(request, authorization, user_id)
+
+
+# -------------------- GET: CHANGE FEED (SSE) --------------------
+# Streams `change` events ({op, collection, id, doc}) for the caller's
+# transactions, profits and founder entries. Reconnects send Last-Event-ID
+# (browsers do this automatically) and get the missed events replayed; a
+# `reset` event means the gap couldn't be replayed and lists should reload.
+@router.get("/")
+async def stream_changes(
+    user_id: str = Depends(get_stream_user_id),
+    last_event_id: Optional[str] = Header(None)
+):
+    return StreamingResponse(
+        change_feed.stream(user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats")
+async def change_feed_stats():
+    return get_change_feed_stats()
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Header, HTTPException
-from pydantic import BaseModel, validator
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import validator
 from typing import Optional
 from datetime import datetime
 from db_utils.get_connection import get_collection
+from app.utils.auth_utils import get_current_user_id
+from app.utils.cache_utils import cached_response, invalidate_user_cache
+from app.utils.serialization import serialize_doc, projection
+from app.utils.query_utils import parse_fields
+from app.utils.batch_utils import BatchDelete, BatchUpdate, batch_delete, batch_update, summarize
+from app.utils.events_utils import publish_changes
 from bson import ObjectId
+from pymongo import ReturnDocument
+from db_utils.rollups import apply_rollups, get_rollup
+from db_utils.tombstones import record_deletions
+from db_utils.user_ids import canonical_user_id, owner_filter
+from db_utils.amounts import amount_fields, to_major
+from app.utils.amount_utils import AmountInput
 
 router = APIRouter()
 
@@ -11,9 +23,13 @@ router = APIRouter()
 
 FOUNDERS = ["Utkarsh", "Umang"]
 
-class FounderTransactionCreate(BaseModel):
+FOUNDER_TRANSACTION_FIELDS = (
+    "_id", "user_id", "type", "amount", "amount_minor", "date", "paid_by", "paid_to",
+    "payee", "created_at", "updated_at"
+)
+
+class FounderTransactionCreate(AmountInput):
     type: str  # "reimbursement" or "salary"
-    amount: float
     date: str  # YYYY-MM-DD or ISO
     paid_by: Optional[str] = None
     paid_to: Optional[str] = None
@@ -62,20 +78,17 @@ class FounderTransactionCreate(BaseModel):
 @router.post("/")
 async def add_founder_transaction(
     data: FounderTransactionCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     try:
         txn_date = datetime.fromisoformat(data.date)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
     txn = {
-        "user_id": user_id,
+        "user_id": canonical_user_id(user_id),
         "type": data.type,
-        "amount": data.amount,
+        **amount_fields(data.amount_minor),
         "date": txn_date,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
@@ -89,71 +102,81 @@ async def add_founder_transaction(
 
     collection = get_collection("founders_transactions")
     await collection.insert_one(txn)
+    await apply_rollups(user_id, "founders_transactions", added=[txn])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "founders_transactions", inserted=[txn])
 
     return {"message": "Transaction added"}
 
 
-# -------------------- GET: FETCH ALL + STATS --------------------
-@router.get("/")
-async def get_founder_transactions(user_id: str = Header(None)):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
-    # 1. Fetch founders_transactions
-    ft_collection = get_collection("founders_transactions")
-    founder_txns = await ft_collection.find({"user_id": user_id}).sort("date", -1).to_list(length=None)
+# -------------------- SUMMARY: ROLLUPS --------------------
+async def compute_founders_summary(user_id: str) -> dict:
+    # Totals are maintained incrementally in users_rollups by every write,
+    # in minor units, so the arithmetic below is exact
+    rollup = await get_rollup(user_id)
 
-    # 2. Fetch investment totals from users_transactions (expenses where payee is a founder)
-    ut_collection = get_collection("users_transactions")
-    user_txns = await ut_collection.find({
-        "user_id": user_id,
-        "type": "expense",
-        "payee": {"$in": FOUNDERS}
-    }).to_list(length=None)
+    totals = {
+        founder: {
+            "total_invested": rollup.get("invested", {}).get(founder, 0),
+            "reimbursements_received": rollup.get("reimbursements_received", {}).get(founder, 0),
+            "reimbursements_made": rollup.get("reimbursements_made", {}).get(founder, 0),
+            "salary_taken": rollup.get("salary_taken", {}).get(founder, 0)
+        }
+        for founder in FOUNDERS
+    }
 
-    # 3. Compute per-founder stats
+    # Compute per-founder stats
     summary = {}
-    for founder in FOUNDERS:
-        total_invested = sum(
-            t["amount"] for t in user_txns if t.get("payee") == founder
-        )
-        reimbursements_received = sum(
-            t["amount"] for t in founder_txns
-            if t["type"] == "reimbursement" and t.get("paid_to") == founder
-        )
-        reimbursements_made = sum(
-            t["amount"] for t in founder_txns
-            if t["type"] == "reimbursement" and t.get("paid_by") == founder
-        )
-        salary_taken = sum(
-            t["amount"] for t in founder_txns
-            if t["type"] == "salary" and t.get("payee") == founder
-        )
+    for founder, t in totals.items():
         # Effective contribution = total invested - reimbursements received
         # Exact payment (total out-of-pocket) = effective contribution + reimbursements made
-        exact_payment = total_invested - reimbursements_received + reimbursements_made
+        exact_payment = t["total_invested"] - t["reimbursements_received"] + t["reimbursements_made"]
         # Positive net = taken out more salary than total out-of-pocket
-        net_contribution = salary_taken - exact_payment
+        net_contribution = t["salary_taken"] - exact_payment
 
         summary[founder] = {
-            "total_invested": round(total_invested, 2),
-            "reimbursements_received": round(reimbursements_received, 2),
-            "reimbursements_made": round(reimbursements_made, 2),
-            "salary_taken": round(salary_taken, 2),
-            "exact_payment": round(exact_payment, 2),
-            "net_contribution": round(net_contribution, 2)
+            "total_invested": to_major(t["total_invested"]),
+            "reimbursements_received": to_major(t["reimbursements_received"]),
+            "reimbursements_made": to_major(t["reimbursements_made"]),
+            "salary_taken": to_major(t["salary_taken"]),
+            "exact_payment": to_major(exact_payment),
+            "net_contribution": to_major(net_contribution)
         }
 
-    # 4. Serialize and split into reimbursements / salaries
+    return summary
+
+
+# -------------------- GET: SUMMARY ONLY --------------------
+@router.get("/summary")
+@cached_response()
+async def get_founders_summary(request: Request, user_id: str = Depends(get_current_user_id)):
+    return {"founders_summary": await compute_founders_summary(user_id)}
+
+
+# -------------------- GET: FETCH ALL + STATS --------------------
+@router.get("/")
+@cached_response()
+async def get_founder_transactions(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    fields: Optional[str] = None
+):
+    selected = parse_fields(fields, FOUNDER_TRANSACTION_FIELDS)
+    ft_collection = get_collection("founders_transactions")
+    # `type` is always fetched to split the rows
+    founder_txns = ft_collection.find(
+        owner_filter(user_id), projection(selected + ("type",))
+    ).sort("date", -1)
+
+    summary = await compute_founders_summary(user_id)
+
+    # Serialize and split into reimbursements / salaries
     reimbursements = []
     salaries = []
 
-    for t in founder_txns:
-        t["_id"] = str(t["_id"])
-        if isinstance(t["date"], datetime):
-            t["date"] = t["date"].date().isoformat()
-
-        if t["type"] == "reimbursement":
+    async for doc in founder_txns:
+        t = serialize_doc(doc, selected)
+        if doc.get("type") == "reimbursement":
             reimbursements.append(t)
         else:
             salaries.append(t)
@@ -165,46 +188,78 @@ async def get_founder_transactions(user_id: str = Header(None)):
     }
 
 
+# -------------------- BATCH: PATCH / DELETE --------------------
+def _founder_fields(data: FounderTransactionCreate) -> dict:
+    fields = {
+        "type": data.type,
+        **amount_fields(data.amount_minor),
+        "date": datetime.fromisoformat(data.date)
+    }
+
+    if data.type == "reimbursement":
+        fields["paid_by"] = data.paid_by
+        fields["paid_to"] = data.paid_to
+        fields["payee"] = None
+    else:
+        fields["payee"] = data.payee
+        fields["paid_by"] = None
+        fields["paid_to"] = None
+
+    return fields
+
+
+@router.patch("/batch")
+async def batch_update_founder_transactions(
+    payload: BatchUpdate,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_update(
+        "founders_transactions", user_id, owner_filter(user_id),
+        payload.updates, FounderTransactionCreate, _founder_fields
+    )
+    return summarize(results)
+
+
+@router.post("/batch/delete")
+async def batch_delete_founder_transactions(
+    payload: BatchDelete,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_delete("founders_transactions", user_id, owner_filter(user_id), payload.ids)
+    return summarize(results)
+
+
 # -------------------- PUT: UPDATE TRANSACTION --------------------
 @router.put("/{transaction_id}")
 async def update_founder_transaction(
     transaction_id: str,
     data: FounderTransactionCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     try:
         txn_date = datetime.fromisoformat(data.date)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-    update_data = {
-        "type": data.type,
-        "amount": data.amount,
-        "date": txn_date,
-        "updated_at": datetime.utcnow()
-    }
-
-    if data.type == "reimbursement":
-        update_data["paid_by"] = data.paid_by
-        update_data["paid_to"] = data.paid_to
-        update_data["payee"] = None
-    else:
-        update_data["payee"] = data.payee
-        update_data["paid_by"] = None
-        update_data["paid_to"] = None
+    update_data = {**_founder_fields(data), "date": txn_date, "updated_at": datetime.utcnow()}
 
     collection = get_collection("founders_transactions")
-    result = await collection.update_one(
-        {"_id": ObjectId(transaction_id), "user_id": user_id},
-        {"$set": update_data}
+    previous = await collection.find_one_and_update(
+        {"_id": ObjectId(transaction_id), **owner_filter(user_id)},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    await apply_rollups(
+        user_id, "founders_transactions",
+        added=[{**previous, **update_data}], removed=[previous]
+    )
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "founders_transactions", updated=[{**previous, **update_data}])
+
     return {"message": "Transaction updated successfully"}
 
 
@@ -212,18 +267,20 @@ async def update_founder_transaction(
 @router.delete("/{transaction_id}")
 async def delete_founder_transaction(
     transaction_id: str,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     collection = get_collection("founders_transactions")
-    result = await collection.delete_one({
+    deleted = await collection.find_one_and_delete({
         "_id": ObjectId(transaction_id),
-        "user_id": user_id
+        **owner_filter(user_id)
     })
 
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    await apply_rollups(user_id, "founders_transactions", removed=[deleted])
+    await record_deletions(user_id, "founders_transactions", [deleted])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "founders_transactions", deleted=[deleted])
+
     return {"message": "Transaction deleted successfully"}
@@ -0,0 +1,125 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from bson import ObjectId
+from db_utils.get_connection import get_collection
+from db_utils.tombstones import TOMBSTONES_COLLECTION, TOMBSTONE_TTL_DAYS
+from db_utils.user_ids import owner_filter
+from app.utils.auth_utils import get_current_user_id
+from app.utils.query_utils import after_position, decode_sync_token, encode_sync_token
+from app.utils.serialization import dumps, serialize_doc, projection
+from app.endpoints.users_transactions_endpoint import TRANSACTION_FIELDS
+from app.endpoints.users_business_profit_endpoint import PROFIT_FIELDS
+from app.endpoints.founders_transactions_endpoint import FOUNDER_TRANSACTION_FIELDS
+
+router = APIRouter()
+
+SYNC_SOURCES = {
+    "users_transactions": TRANSACTION_FIELDS,
+    "users_business_profit": PROFIT_FIELDS,
+    "founders_transactions": FOUNDER_TRANSACTION_FIELDS,
+}
+
+SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 5000
+
+# Rows stamped in the last few seconds may still be in flight; they are left
+# for the next sync rather than risk skipping them
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "2"))
+
+MIN_ID = ObjectId("0" * 24)
+MAX_ID = ObjectId("f" * 24)
+
+
+# -------------------- HELPERS --------------------
+def _start_positions(since: Optional[str], until: datetime) -> dict:
+    names = list(SYNC_SOURCES) + [TOMBSTONES_COLLECTION]
+
+    if not since:
+        # Full sync: every live row, no tombstones
+        positions = {name: (datetime.min, MIN_ID) for name in SYNC_SOURCES}
+        positions[TOMBSTONES_COLLECTION] = (until, MAX_ID)
+        return positions
+
+    try:
+        since_ts = datetime.fromisoformat(since)
+    except ValueError:
+        positions = decode_sync_token(since)
+        if set(positions) != set(names):
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+    else:
+        if since_ts.tzinfo is not None:
+            since_ts = since_ts.astimezone(timezone.utc).replace(tzinfo=None)
+        positions = {name: (since_ts, MIN_ID) for name in names}
+
+    # Only deletions expire: row positions may be as old as the rows they page through
+    deleted_since, _ = positions[TOMBSTONES_COLLECTION]
+    if deleted_since < datetime.utcnow() - timedelta(days=TOMBSTONE_TTL_DAYS):
+        raise HTTPException(
+            status_code=410,
+            detail="Last sync is older than the deletion history; do a full sync"
+        )
+    return positions
+
+
+async def _page(collection_name: str, query: dict, field: str, fields: dict, limit: int) -> list:
+    cursor = get_collection(collection_name).find(query, fields).sort(
+        [(field, 1), ("_id", 1)]
+    ).limit(limit + 1)
+    return await cursor.to_list(length=limit + 1)
+
+
+# -------------------- GET: DELTA SYNC --------------------
+# First call without `since` (full sync) or with an ISO timestamp; after that
+# pass back `next_since`. Rows are returned in (updated_at, _id) order, up to
+# `limit` per collection; while `has_more` is true, call again right away.
+@router.get("/")
+async def sync(
+    user_id: str = Depends(get_current_user_id),
+    since: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=MAX_SYNC_PAGE_SIZE)
+):
+    until = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    positions = _start_positions(since, until)
+
+    changes = {}
+    deleted = {name: [] for name in SYNC_SOURCES}
+    has_more = False
+
+    for collection_name, fields in SYNC_SOURCES.items():
+        ts, oid = positions[collection_name]
+        query = {**owner_filter(user_id), **after_position("updated_at", ts, oid, until)}
+        rows = await _page(collection_name, query, "updated_at", projection(fields), limit)
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+            positions[collection_name] = (rows[-1]["updated_at"], rows[-1]["_id"])
+        else:
+            positions[collection_name] = (until, MAX_ID)
+        changes[collection_name] = [serialize_doc(row, fields) for row in rows]
+
+    ts, oid = positions[TOMBSTONES_COLLECTION]
+    if ts < until:
+        query = {**owner_filter(user_id), **after_position("deleted_at", ts, oid, until)}
+        tombstones = await _page(
+            TOMBSTONES_COLLECTION, query, "deleted_at",
+            {"collection": 1, "record_id": 1, "deleted_at": 1}, limit
+        )
+        if len(tombstones) > limit:
+            tombstones = tombstones[:limit]
+            has_more = True
+            positions[TOMBSTONES_COLLECTION] = (tombstones[-1]["deleted_at"], tombstones[-1]["_id"])
+        else:
+            positions[TOMBSTONES_COLLECTION] = (until, MAX_ID)
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone["collection"], []).append(str(tombstone["record_id"]))
+
+    body = dumps({
+        "changes": changes,
+        "deleted": deleted,
+        "next_since": encode_sync_token(positions),
+        "has_more": has_more
+    })
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from db_utils.get_connection import get_pool_stats
+from app.utils.password_utils import get_hashing_stats
+from app.utils.cache_utils import get_cache_stats
+
+router = APIRouter()
+
+
+# -------------------- DB POOL --------------------
+@router.get("/db-pool")
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+# -------------------- PASSWORD HASHING --------------------
+@router.get("/hashing")
+async def password_hashing_stats():
+    return get_hashing_stats()
+
+
+# -------------------- RESPONSE CACHE --------------------
+@router.get("/cache")
+async def response_cache_stats():
+    return get_cache_stats()
@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Header, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Optional
 from db_utils.get_connection import get_collection
+from app.utils.auth_utils import get_current_user_id
+from app.utils.cache_utils import cached_response, invalidate_user_cache
+from app.utils.serialization import serialize_doc, projection
+from app.utils.batch_utils import BatchDelete, BatchUpdate, batch_delete, batch_update, summarize
+from app.utils.events_utils import publish_changes
 from bson import ObjectId
+from pymongo import ReturnDocument
+from app.utils.query_utils import local_date_range_filter, parse_fields, parse_timezone
+from db_utils.rollups import apply_rollups, get_rollup, ALL_TIME
+from db_utils.tombstones import record_deletions
+from db_utils.user_ids import canonical_user_id, owner_filter
+from db_utils.amounts import amount_fields, amount_minor_expr, to_major
+from app.utils.amount_utils import AmountInput
 
 router = APIRouter()
 
+PROFIT_FIELDS = (
+    "_id", "user_id", "amount", "amount_minor", "date", "details", "category", "created_at", "updated_at"
+)
+
 # -------------------- MODELS --------------------
 
-class ProfitCreate(BaseModel):
-    amount: float
+class ProfitCreate(AmountInput):
     date: str
     details: str | None = None
     category: str | None = None
@@ -20,11 +34,8 @@ class ProfitCreate(BaseModel):
 @router.post("/")
 async def add_profit(
     data: ProfitCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     try:
         profit_date = datetime.fromisoformat(data.date)
     except ValueError:
@@ -33,64 +44,169 @@ async def add_profit(
     collection = get_collection("users_business_profit")
 
     profit = {
-        "user_id": ObjectId(user_id),
-        "amount": data.amount,
+        "user_id": canonical_user_id(user_id),
+        **amount_fields(data.amount_minor),
         "date": profit_date,
         "details": data.details,
         "category": data.category,
-        "created_at": datetime.utcnow()
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
     }
 
     await collection.insert_one(profit)
+    await apply_rollups(user_id, "users_business_profit", added=[profit])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_business_profit", inserted=[profit])
 
     return {"message": "Profit entry added"}
 
 
 # -------------------- GET: FETCH PROFITS --------------------
 @router.get("/")
-async def get_profits(user_id: str = Header(None)):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
+@cached_response()
+async def get_profits(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    fields: Optional[str] = None
+):
     collection = get_collection("users_business_profit")
+    selected = parse_fields(fields, PROFIT_FIELDS)
 
-    profits = await collection.find({"user_id": ObjectId(user_id)}).sort("date", -1).to_list(length=None)
+    profits = [
+        serialize_doc(p, selected)
+        async for p in collection.find(
+            owner_filter(user_id), projection(selected)
+        ).sort("date", -1)
+    ]
 
-    total_profit = 0
-    current_month_profit = 0
+    # Totals come from the incrementally maintained rollups, in minor units
     now = datetime.utcnow()
+    all_time = await get_rollup(user_id, ALL_TIME)
+    this_month = await get_rollup(user_id, now.strftime("%Y-%m"))
 
-    for p in profits:
-        total_profit += p["amount"]
-        if p["date"].month == now.month and p["date"].year == now.year:
-            current_month_profit += p["amount"]
-
-    avg_profit = total_profit / len(profits) if profits else 0
+    total_profit = all_time.get("profit_total", 0)
+    profit_count = all_time.get("profit_count", 0)
+    current_month_profit = this_month.get("profit_total", 0)
 
-    # serialize
-    for p in profits:
-        p["_id"] = str(p["_id"])
-        p["user_id"] = str(p["user_id"])
-        p["date"] = p["date"].date().isoformat()
+    avg_profit = total_profit / profit_count if profit_count else 0
 
     return {
-        "total_profit": total_profit,
-        "this_month_profit": current_month_profit,
-        "average_profit": round(avg_profit, 2),
+        "total_profit": to_major(total_profit),
+        "this_month_profit": to_major(current_month_profit),
+        "average_profit": round(to_major(avg_profit), 2),
         "entries": profits
     }
 
 
+# -------------------- GET: PROFIT SERIES --------------------
+# Buckets are grouped in Mongo with $dateTrunc so only one row per
+# (period, category) leaves the server; the response is column-oriented:
+# `periods[i]` pairs with `total[i]`, `count[i]` and `categories[c][i]`.
+
+UNCATEGORIZED = "uncategorized"
+
+
+@router.get("/series")
+@cached_response()
+async def get_profit_series(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    period: Literal["day", "week", "month", "quarter", "year"] = "month",
+    tz: str = "UTC",
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to")
+):
+    zone = parse_timezone(tz)
+    date_filter = local_date_range_filter(date_from, date_to, zone) or {}
+    # Rows without a date have no period to fall in
+    match = {**owner_filter(user_id), "date": {"$ne": None, **date_filter}}
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "p": {"$dateTrunc": {"date": "$date", "unit": period, "timezone": tz}},
+                "c": "$category"
+            },
+            "total": {"$sum": amount_minor_expr()},
+            "count": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "p": {"$dateToString": {"date": "$_id.p", "format": "%Y-%m-%d", "timezone": tz}},
+            "c": "$_id.c",
+            "total": 1,
+            "count": 1
+        }},
+        {"$sort": {"p": 1}}
+    ]
+
+    collection = get_collection("users_business_profit")
+
+    periods, totals, counts, categories = [], [], [], {}
+    async for row in collection.aggregate(pipeline):
+        if not periods or periods[-1] != row["p"]:
+            periods.append(row["p"])
+            totals.append(0)
+            counts.append(0)
+        totals[-1] += row["total"]
+        counts[-1] += row["count"]
+        series = categories.setdefault(row["c"] or UNCATEGORIZED, {})
+        series[row["p"]] = series.get(row["p"], 0) + row["total"]
+
+    return {
+        "period": period,
+        "timezone": tz,
+        "periods": periods,
+        "total": [to_major(t) for t in totals],
+        "count": counts,
+        "categories": {
+            name: [to_major(series.get(p, 0)) for p in periods]
+            for name, series in sorted(categories.items())
+        }
+    }
+
+
+# -------------------- BATCH: PATCH / DELETE --------------------
+def _profit_fields(data: ProfitCreate) -> dict:
+    return {
+        **amount_fields(data.amount_minor),
+        "date": datetime.fromisoformat(data.date),
+        "details": data.details,
+        "category": data.category
+    }
+
+
+@router.patch("/batch")
+async def batch_update_profits(
+    payload: BatchUpdate,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_update(
+        "users_business_profit", user_id, owner_filter(user_id),
+        payload.updates, ProfitCreate, _profit_fields
+    )
+    return summarize(results)
+
+
+@router.post("/batch/delete")
+async def batch_delete_profits(
+    payload: BatchDelete,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_delete(
+        "users_business_profit", user_id, owner_filter(user_id), payload.ids
+    )
+    return summarize(results)
+
+
 # -------------------- PUT: UPDATE PROFIT --------------------
 @router.put("/{profit_id}")
 async def update_profit(
     profit_id: str,
     data: ProfitCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     try:
         profit_date = datetime.fromisoformat(data.date)
     except ValueError:
@@ -98,22 +214,24 @@ async def update_profit(
 
     collection = get_collection("users_business_profit")
 
-    update_data = {
-        "amount": data.amount,
-        "date": profit_date,
-        "details": data.details,
-        "category": data.category,
-        "updated_at": datetime.utcnow()
-    }
+    update_data = {**_profit_fields(data), "date": profit_date, "updated_at": datetime.utcnow()}
 
-    result = await collection.update_one(
-        {"_id": ObjectId(profit_id), "user_id": ObjectId(user_id)},
-        {"$set": update_data}
+    previous = await collection.find_one_and_update(
+        {"_id": ObjectId(profit_id), **owner_filter(user_id)},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Profit entry not found")
 
+    await apply_rollups(
+        user_id, "users_business_profit",
+        added=[{**previous, **update_data}], removed=[previous]
+    )
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_business_profit", updated=[{**previous, **update_data}])
+
     return {"message": "Profit entry updated"}
 
 
@@ -121,18 +239,20 @@ async def update_profit(
 @router.delete("/{profit_id}")
 async def delete_profit(
     profit_id: str,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     collection = get_collection("users_business_profit")
 
-    result = await collection.delete_one(
-        {"_id": ObjectId(profit_id), "user_id": ObjectId(user_id)}
+    deleted = await collection.find_one_and_delete(
+        {"_id": ObjectId(profit_id), **owner_filter(user_id)}
     )
 
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Profit entry not found")
 
+    await apply_rollups(user_id, "users_business_profit", removed=[deleted])
+    await record_deletions(user_id, "users_business_profit", [deleted])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_business_profit", deleted=[deleted])
+
     return {"message": "Profit entry deleted"}
\ No newline at end of file
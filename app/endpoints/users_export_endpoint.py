@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from db_utils.get_connection import get_collection
+from db_utils.amounts import doc_amount_minor
+from db_utils.user_ids import owner_filter
+from app.utils.auth_utils import get_current_user_id
+from app.utils.query_utils import date_range_filter
+
+router = APIRouter()
+
+EXPORTABLE_COLLECTIONS = ["users_transactions", "users_business_profit", "founders_transactions"]
+
+EXPORT_FIELDS = [
+    "collection", "id", "date", "type", "amount", "amount_minor", "category", "details",
+    "payee", "paid_by", "paid_to", "created_at", "updated_at"
+]
+
+# Rows per Mongo batch and bytes per response chunk; both bound memory use
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+# -------------------- HELPERS --------------------
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _export_row(collection_name: str, doc: dict) -> dict:
+    date_val = doc.get("date")
+    row = {field: _export_value(doc.get(field)) for field in EXPORT_FIELDS}
+    row["collection"] = collection_name
+    row["id"] = str(doc["_id"])
+    row["date"] = date_val.date().isoformat() if isinstance(date_val, datetime) else date_val
+    try:
+        # Derived from amount for rows not yet migrated
+        row["amount_minor"] = doc_amount_minor(doc)
+    except ValueError:
+        row["amount_minor"] = None
+    return row
+
+
+async def _iter_rows(user_id: str, collections: list, date_filter: Optional[dict]):
+    for collection_name in collections:
+        query = owner_filter(user_id)
+        if date_filter:
+            query["date"] = date_filter
+        cursor = get_collection(collection_name).find(query).sort("date", 1).batch_size(EXPORT_BATCH_SIZE)
+        async for doc in cursor:
+            yield _export_row(collection_name, doc)
+
+
+async def _stream_ndjson(rows):
+    chunk = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(row, separators=(",", ":")) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def _stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# -------------------- GET: EXPORT LEDGER --------------------
+@router.get("/")
+async def export_ledger(
+    format: str = "ndjson",
+    collections: Optional[List[str]] = Query(None),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    user_id: str = Depends(get_current_user_id)
+):
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    # Accept both ?collections=a&collections=b and ?collections=a,b
+    selected = [c for value in (collections or EXPORTABLE_COLLECTIONS) for c in value.split(",") if c]
+    unknown = [c for c in selected if c not in EXPORTABLE_COLLECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown collections {unknown}; choose from {EXPORTABLE_COLLECTIONS}"
+        )
+
+    date_filter = date_range_filter(date_from, date_to)
+    rows = _iter_rows(user_id, selected, date_filter)
+
+    if format == "csv":
+        body, media_type = _stream_csv(rows), "text/csv"
+    else:
+        body, media_type = _stream_ndjson(rows), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="fintrack-ledger.{format}"'}
+    )
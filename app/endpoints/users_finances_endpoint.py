@@ -1,41 +1,188 @@
-from fastapi import APIRouter, Header, HTTPException
-from bson import ObjectId
+import re
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, validator
+from pymongo import ReturnDocument
 from db_utils.get_connection import get_collection
+from db_utils.user_ids import owner_filter
+from db_utils.rollups import category_key, get_rollup
+from db_utils.amounts import to_major
+from app.utils.auth_utils import get_current_user_id
+from app.utils.cache_utils import cached_response, invalidate_user_cache
 
 router = APIRouter()
 
+MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+MAX_BUDGET_CATEGORIES = 100
+MAX_BUDGET_MONTHS = 120
+MAX_CATEGORY_LENGTH = 64
 
+# -------------------- MODELS --------------------
+
+def _validate_category_budgets(v):
+    if v is None:
+        raise ValueError("can't be null; send {} to clear")
+    if len(v) > MAX_BUDGET_CATEGORIES:
+        raise ValueError(f"at most {MAX_BUDGET_CATEGORIES} categories")
+    for category, amount in v.items():
+        if not category or len(category) > MAX_CATEGORY_LENGTH:
+            raise ValueError(f"category names must be 1-{MAX_CATEGORY_LENGTH} characters")
+        if "." in category or category.startswith("$"):
+            raise ValueError("category names can't contain '.' or start with '$'")
+        if amount < 0:
+            raise ValueError("budgets can't be negative")
+    return v
+
+
+class MonthBudget(BaseModel):
+    total: Optional[float] = None
+    categories: Dict[str, float] = {}
+
+    class Config:
+        extra = "forbid"
+
+    @validator('total')
+    def validate_total(cls, v):
+        if v is not None and v < 0:
+            raise ValueError("budgets can't be negative")
+        return v
+
+    _check_categories = validator('categories', allow_reuse=True)(_validate_category_budgets)
+
+
+class UserFinancesUpdate(BaseModel):
+    # Default monthly budget, overall and per category
+    user_monthly_expenditure: Optional[float] = None
+    category_budgets: Optional[Dict[str, float]] = None
+    # Overrides for specific months, keyed YYYY-MM
+    monthly_budgets: Optional[Dict[str, MonthBudget]] = None
+
+    class Config:
+        extra = "forbid"
+
+    @validator('user_monthly_expenditure')
+    def validate_expenditure(cls, v):
+        if v is not None and v < 0:
+            raise ValueError("user_monthly_expenditure can't be negative")
+        return v
+
+    _check_categories = validator('category_budgets', allow_reuse=True)(_validate_category_budgets)
+
+    @validator('monthly_budgets')
+    def validate_months(cls, v):
+        if v is None:
+            raise ValueError("can't be null")
+        if len(v) > MAX_BUDGET_MONTHS:
+            raise ValueError(f"at most {MAX_BUDGET_MONTHS} months")
+        for month in v:
+            if not MONTH_PATTERN.match(month):
+                raise ValueError("months must be YYYY-MM")
+        return v
+
+
+# -------------------- BUDGET VS ACTUAL --------------------
+# Actual spend comes from the monthly users_rollups bucket, which every
+# expense write keeps current, so utilization never scans the ledger.
+
+def _line(budget: float | None, spent_minor: int) -> dict:
+    # Budgets are set in major units; rollup spend is in minor units
+    spent = to_major(spent_minor)
+    return {
+        "budget": budget,
+        "spent": spent,
+        "remaining": round(budget - spent, 2) if budget is not None else None,
+        "utilization": round(spent / budget, 4) if budget else None
+    }
+
+
+def budget_utilization(finances: dict, month: str, rollup: dict) -> dict:
+    # `or {}`: documents may hold explicit nulls written before they were rejected
+    override = (finances.get("monthly_budgets") or {}).get(month) or {}
+    total_budget = override.get("total")
+    if total_budget is None:
+        total_budget = finances.get("user_monthly_expenditure")
+    category_budgets = {**(finances.get("category_budgets") or {}), **(override.get("categories") or {})}
+
+    spent_by_category = rollup.get("expense_by_category", {})
+    categories = {
+        category: _line(budget, spent_by_category.get(category_key(category), 0))
+        for category, budget in category_budgets.items()
+    }
+    # Spend in categories without a budget is still reported
+    budgeted = {category_key(category) for category in category_budgets}
+    for key, spent in spent_by_category.items():
+        if key not in budgeted and spent:
+            categories[key] = _line(None, spent)
+
+    return {
+        "month": month,
+        "total": _line(total_budget, rollup.get("txn_expense", 0)),
+        "categories": categories
+    }
+
+
+# -------------------- GET: FINANCES + UTILIZATION --------------------
 @router.get("/")
-async def get_user_finances(user_id: str = Header(None)):
-    if not user_id:
-        raise HTTPException(detail="User ID missing", status_code=400)
+@cached_response()
+async def get_user_finances(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    month: Optional[str] = None
+):
+    if month is None:
+        month = datetime.utcnow().strftime("%Y-%m")
+    elif not MONTH_PATTERN.match(month):
+        raise HTTPException(detail="month must be YYYY-MM", status_code=400)
 
     finances = get_collection("users_finances")
-    data = await finances.find_one({"user_id": user_id})
+    data = await finances.find_one(owner_filter(user_id))
 
     if not data:
         raise HTTPException(detail="User finance data not found", status_code=404)
 
     data["_id"] = str(data["_id"])
     data["user_id"] = str(data["user_id"])
+    data["budget"] = budget_utilization(data, month, await get_rollup(user_id, month))
 
     return data
 
 
+# -------------------- PUT: BUDGETS --------------------
+# Only the fields sent are changed; month overrides are merged by month, and
+# beyond MAX_BUDGET_MONTHS stored months the oldest are dropped.
 @router.put("/")
-async def update_user_finances(data: dict, user_id: str = Header(None)):
-    if not user_id:
-        raise HTTPException(detail="User ID missing", status_code=400)
-
+async def update_user_finances(data: UserFinancesUpdate, user_id: str = Depends(get_current_user_id)):
     finances = get_collection("users_finances")
 
-    # Remove _id if present to avoid Mongo write errors
-    if "_id" in data:
-        del data["_id"]
+    update = data.dict(exclude_unset=True)
+    monthly = update.pop("monthly_budgets", None) or {}
+    for month, budget in monthly.items():
+        update[f"monthly_budgets.{month}"] = budget
+
+    if not update:
+        raise HTTPException(detail="Nothing to update", status_code=400)
 
-    result = await finances.update_one({"user_id": user_id}, {"$set": data})
+    result = await finances.find_one_and_update(
+        owner_filter(user_id),
+        {"$set": update},
+        projection={"_id": 0, "user_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
 
-    if result.matched_count == 0:
+    if result is None:
         raise HTTPException(detail="User finance data not found", status_code=404)
 
-    return data
+    stored_months = sorted(result.get("monthly_budgets") or {})
+    if len(stored_months) > MAX_BUDGET_MONTHS:
+        dropped = stored_months[:-MAX_BUDGET_MONTHS]
+        await finances.update_one(
+            owner_filter(user_id),
+            {"$unset": {f"monthly_budgets.{month}": "" for month in dropped}}
+        )
+        for month in dropped:
+            del result["monthly_budgets"][month]
+
+    await invalidate_user_cache(user_id)
+
+    return result
@@ -1,19 +1,49 @@
-from fastapi import APIRouter, Header, HTTPException
-from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import List, Literal, Optional, Union
+from pydantic import BaseModel, Field, ValidationError, validator
 from datetime import datetime
 from db_utils.get_connection import get_collection
+from app.utils.auth_utils import get_current_user_id
+from app.utils.cache_utils import cached_response, invalidate_user_cache
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from db_utils.rollups import apply_rollups, get_monthly_rollups
+from db_utils.tombstones import record_deletions
+from db_utils.user_ids import canonical_user_id, owner_filter
+from db_utils.amounts import amount_fields, amount_minor_expr, to_major
+from app.utils.amount_utils import AmountInput
+from app.utils.query_utils import (
+    date_range_filter, encode_cursor, keyset_filter, local_date_range_filter, parse_fields,
+    parse_timezone
+)
+from app.utils.serialization import serialize_doc, projection
+from app.utils.batch_utils import BatchDelete, BatchUpdate, batch_delete, batch_update, summarize
+from app.utils.events_utils import publish_changes
+from app.utils.import_utils import (
+    detect_format, iter_lines, iter_csv_rows, iter_ndjson_rows, format_validation_error
+)
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Fields returned by the list endpoint, in TransactionResponse order
+TRANSACTION_FIELDS = (
+    "_id", "user_id", "type", "amount", "amount_minor", "date", "category",
+    "details", "payee", "created_at", "updated_at"
+)
+
+BULK_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
 # -----------------------------
 # Models
 # -----------------------------
 
-class TransactionCreate(BaseModel):
+class TransactionCreate(AmountInput):
     type: str
-    amount: float
     date: str  # Receiving as string YYYY-MM-DD or ISO
     category: str
     details: Optional[str] = None
@@ -45,6 +75,7 @@ class TransactionResponse(BaseModel):
     user_id: str
     type: str
     amount: float
+    amount_minor: Optional[int] = None
     date: str
     category: str
     details: Optional[str] = None
@@ -58,17 +89,18 @@ class TransactionResponse(BaseModel):
             ObjectId: str
         }
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
 # -----------------------------
 # POST: Add transaction
 # -----------------------------
 @router.post("/", response_model=TransactionResponse)
 async def add_transaction(
     transaction: TransactionCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(detail="User ID missing", status_code=400)
-
     try:
         # Convert date string to datetime for storage
         txn_date = datetime.fromisoformat(transaction.date)
@@ -76,9 +108,9 @@ async def add_transaction(
         raise HTTPException(detail="Invalid date format", status_code=400)
 
     txn_data = {
-        "user_id": user_id,
+        "user_id": canonical_user_id(user_id),
         "type": transaction.type,
-        "amount": transaction.amount,
+        **amount_fields(transaction.amount_minor),
         "date": txn_date,
         "category": transaction.category,
         "details": transaction.details,
@@ -89,92 +121,386 @@ async def add_transaction(
 
     collection = get_collection("users_transactions")
     result = await collection.insert_one(txn_data)
+    await apply_rollups(user_id, "users_transactions", added=[txn_data])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_transactions", inserted=[txn_data])
 
     # Prepare response
     txn_data["_id"] = str(result.inserted_id)
+    txn_data["user_id"] = user_id
     # Check if date is datetime before calling date()
     if isinstance(txn_data["date"], datetime):
          txn_data["date"] = txn_data["date"].date().isoformat()
 
     return txn_data
 
+# -----------------------------
+# POST: Bulk import (CSV / NDJSON)
+# -----------------------------
+# Send the file as the raw request body with Content-Type text/csv or
+# application/x-ndjson (or ?format=csv|ndjson). Rows are validated and
+# inserted in chunks; invalid rows are reported without aborting the import.
+@router.post("/bulk")
+async def bulk_import_transactions(
+    request: Request,
+    format: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id)
+):
+    fmt = detect_format(format, request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(
+            detail="Unsupported format. Use text/csv or application/x-ndjson",
+            status_code=415
+        )
+
+    collection = get_collection("users_transactions")
+    owner = canonical_user_id(user_id)
+    parse_rows = iter_csv_rows if fmt == "csv" else iter_ndjson_rows
+
+    inserted = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    def record_error(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": message})
+
+    async def flush():
+        nonlocal inserted
+        docs = [doc for _, doc in batch]
+        failed_indexes = set()
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed_indexes.add(err["index"])
+                record_error(batch[err["index"]][0], err.get("errmsg", "write failed"))
+
+        written = [doc for i, doc in enumerate(docs) if i not in failed_indexes]
+        inserted += len(written)
+        await apply_rollups(user_id, "users_transactions", added=written)
+        await invalidate_user_cache(user_id)
+        publish_changes(user_id, "users_transactions", inserted=written)
+        batch.clear()
+
+    async for row_number, row in parse_rows(iter_lines(request.stream())):
+        if isinstance(row, str):
+            record_error(row_number, row)
+            continue
+
+        try:
+            transaction = TransactionCreate(**row)
+        except ValidationError as e:
+            record_error(row_number, format_validation_error(e))
+            continue
+
+        now = datetime.utcnow()
+        batch.append((row_number, {
+            "user_id": owner,
+            "type": transaction.type,
+            **amount_fields(transaction.amount_minor),
+            "date": datetime.fromisoformat(transaction.date),
+            "category": transaction.category,
+            "details": transaction.details,
+            "payee": transaction.payee,
+            "created_at": now,
+            "updated_at": now,
+        }))
+
+        if len(batch) >= BULK_CHUNK_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
+
 # -----------------------------
 # GET: Transactions for user
 # -----------------------------
-@router.get("/", response_model=List[TransactionResponse])
-async def get_user_transactions(user_id: str = Header(None)):
-    if not user_id:
-        raise HTTPException(detail="User ID missing", status_code=400)
+# Keyset-paginated on (date desc, _id desc). Pass paginate=false for the
+# legacy unpaginated list while clients migrate. fields=date,amount trims
+# both the Mongo projection and each item (_id is always included).
+@router.get("/", response_model=Union[TransactionPage, List[TransactionResponse]])
+@cached_response(Union[TransactionPage, List[TransactionResponse]], revalidate=False)
+async def get_user_transactions(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    payee: Optional[str] = None,
+    paginate: bool = True,
+    fields: Optional[str] = None
+):
+    query = owner_filter(user_id)
+    date_filter = date_range_filter(date_from, date_to)
+    if date_filter:
+        query["date"] = date_filter
+    if type:
+        query["type"] = type
+    if category:
+        query["category"] = category
+    if payee:
+        query["payee"] = payee
 
     collection = get_collection("users_transactions")
+
+    selected = parse_fields(fields, TRANSACTION_FIELDS)
+    # The cursor needs date and _id even when the client didn't ask for them
+    fetch = projection(selected + ("date",))
+
+    if not paginate:
+        find = collection.find(query, fetch).sort("date", -1)
+    else:
+        if cursor:
+            query.update(keyset_filter(cursor))
+        limit = min(limit, MAX_PAGE_SIZE)
+        # Fetch one extra row to know whether another page exists
+        find = collection.find(query, fetch).sort([("date", -1), ("_id", -1)]).limit(limit + 1)
+
     transactions = []
+    next_cursor = None
+    last_key = None
+
+    async for txn in find:
+        if paginate and len(transactions) == limit:
+            next_cursor = encode_cursor(last_key)
+            break
+
+        last_key = {"date": txn.get("date"), "_id": txn["_id"]}
+        # One pass: ObjectIds to str, date to YYYY-MM-DD (legacy string dates kept)
+        transactions.append(serialize_doc(txn, selected))
 
-    async for txn in collection.find({"user_id": user_id}).sort("date", -1):
-        txn["_id"] = str(txn["_id"])
-        txn["user_id"] = str(txn["user_id"])
+    if not paginate:
+        return transactions
 
-        # Ensure date is returned as string YYYY-MM-DD
-        date_val = txn.get("date")
-        if isinstance(date_val, datetime):
-            txn["date"] = date_val.date().isoformat()
-        elif isinstance(date_val, str):
-            # If it's already a string, keep it (legacy data might be different)
-            txn["date"] = date_val
+    return {"items": transactions, "next_cursor": next_cursor}
 
-        transactions.append(txn)
+# -----------------------------
+# GET: Cashflow series
+# -----------------------------
+# One aggregation over the (user_id, date) index: $facet computes the
+# opening balance before `from`, the per-period income/expense series and
+# the category/payee split in a single round trip. source=rollups reads the
+# materialized monthly buckets instead (month/UTC only, no split).
+UNSPECIFIED = "unspecified"
 
-    return transactions
+
+def _sum_if(txn_type: str) -> dict:
+    return {"$sum": {"$cond": [{"$eq": ["$type", txn_type]}, amount_minor_expr(), 0]}}
+
+
+def _cashflow_response(period, tz, opening, periods, income, expense, splits) -> dict:
+    # Sums arrive in minor units and are only converted here
+    balance = []
+    running = opening
+    for inc, exp in zip(income, expense):
+        running += inc - exp
+        balance.append(to_major(running))
+
+    return {
+        "period": period,
+        "timezone": tz,
+        "opening_balance": to_major(opening),
+        "periods": periods,
+        "income": [to_major(v) for v in income],
+        "expense": [to_major(v) for v in expense],
+        "balance": balance,
+        "splits": splits
+    }
+
+
+async def _cashflow_from_rollups(user_id: str, date_from: Optional[str], date_to: Optional[str]) -> dict:
+    first = date_from[:7] if date_from else None
+    periods, income, expense = [], [], []
+    opening = 0
+
+    for rollup in await get_monthly_rollups(user_id, last=date_to[:7] if date_to else None):
+        net_income = rollup.get("txn_income", 0)
+        net_expense = rollup.get("txn_expense", 0)
+        if first and rollup["period"] < first:
+            opening += net_income - net_expense
+            continue
+        if not rollup.get("txn_count"):
+            continue
+        periods.append(rollup["period"] + "-01")
+        income.append(net_income)
+        expense.append(net_expense)
+
+    return _cashflow_response("month", "UTC", opening, periods, income, expense, {})
+
+
+@router.get("/cashflow")
+@cached_response()
+async def get_cashflow(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    period: Literal["day", "week", "month"] = "month",
+    tz: str = "UTC",
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    split: Literal["category", "payee", "none"] = "category",
+    source: Literal["transactions", "rollups"] = "transactions"
+):
+    if source == "rollups":
+        if period != "month" or tz != "UTC" or split != "none":
+            raise HTTPException(
+                status_code=400,
+                detail="source=rollups supports only period=month, tz=UTC and split=none"
+            )
+        return await _cashflow_from_rollups(user_id, date_from, date_to)
+
+    zone = parse_timezone(tz)
+    date_filter = local_date_range_filter(date_from, date_to, zone) or {}
+    start = date_filter.pop("$gte", None)
+
+    # Rows without a date have no period to fall in
+    match = {**owner_filter(user_id), "date": {"$ne": None, **date_filter}}
+
+    in_range = [{"$match": {"date": {"$gte": start}}}] if start else []
+    totals = {"income": _sum_if("income"), "expense": _sum_if("expense")}
+
+    facets = {
+        "series": in_range + [
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": {"$toDate": "$date"}, "unit": period, "timezone": tz}},
+                **totals
+            }},
+            {"$sort": {"_id": 1}},
+            {"$project": {
+                "_id": 0,
+                "p": {"$dateToString": {"date": "$_id", "format": "%Y-%m-%d", "timezone": tz}},
+                "income": 1,
+                "expense": 1
+            }}
+        ]
+    }
+    if start:
+        facets["opening"] = [
+            {"$match": {"date": {"$lt": start}}},
+            {"$group": {"_id": None, **totals}}
+        ]
+    if split != "none":
+        facets["split"] = in_range + [
+            {"$group": {"_id": {"t": "$type", "k": f"${split}"}, "total": {"$sum": amount_minor_expr()}}}
+        ]
+
+    collection = get_collection("users_transactions")
+    result = (await collection.aggregate([{"$match": match}, {"$facet": facets}]).to_list(length=1))[0]
+
+    opening = 0
+    for row in result.get("opening", []):
+        opening = row["income"] - row["expense"]
+
+    splits = {}
+    for row in result.get("split", []):
+        txn_type = row["_id"].get("t")
+        if txn_type in ("income", "expense"):
+            key = row["_id"].get("k") or UNSPECIFIED
+            splits.setdefault(txn_type, {})[key] = to_major(row["total"])
+
+    series = result["series"]
+    return _cashflow_response(
+        period, tz, opening,
+        [row["p"] for row in series],
+        [row["income"] for row in series],
+        [row["expense"] for row in series],
+        splits
+    )
+
+# -----------------------------
+# Batch: PATCH many / DELETE many
+# -----------------------------
+def _transaction_fields(payload: TransactionCreate) -> dict:
+    return {
+        "type": payload.type,
+        **amount_fields(payload.amount_minor),
+        "date": datetime.fromisoformat(payload.date),
+        "category": payload.category,
+        "details": payload.details,
+        "payee": payload.payee,
+    }
+
+@router.patch("/batch")
+async def batch_update_transactions(
+    payload: BatchUpdate,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_update(
+        "users_transactions", user_id, owner_filter(user_id),
+        payload.updates, TransactionCreate, _transaction_fields
+    )
+    return summarize(results)
+
+@router.post("/batch/delete")
+async def batch_delete_transactions(
+    payload: BatchDelete,
+    user_id: str = Depends(get_current_user_id)
+):
+    results = await batch_delete("users_transactions", user_id, owner_filter(user_id), payload.ids)
+    return summarize(results)
 
 @router.put("/{transaction_id}")
 async def update_transaction(
     transaction_id: str,
     payload: TransactionCreate,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     collection = get_collection("users_transactions")
 
-    result = await collection.update_one(
+    update_data = {**_transaction_fields(payload), "updated_at": datetime.utcnow()}
+
+    previous = await collection.find_one_and_update(
         {
             "_id": ObjectId(transaction_id),
-            "user_id": user_id
+            **owner_filter(user_id)
         },
-        {
-            "$set": {
-                "type": payload.type,
-                "amount": payload.amount,
-                "date": datetime.fromisoformat(payload.date),
-                "category": payload.category,
-                "details": payload.details,
-                "payee": payload.payee,
-                "updated_at": datetime.utcnow()
-            }
-        }
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    await apply_rollups(
+        user_id, "users_transactions",
+        added=[{**previous, **update_data}], removed=[previous]
+    )
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_transactions", updated=[{**previous, **update_data}])
+
     return {"message": "Transaction updated successfully"}
 
 @router.delete("/{transaction_id}")
 async def delete_transaction(
     transaction_id: str,
-    user_id: str = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing")
-
     collection = get_collection("users_transactions")
 
-    result = await collection.delete_one({
+    deleted = await collection.find_one_and_delete({
         "_id": ObjectId(transaction_id),
-        "user_id": user_id
+        **owner_filter(user_id)
     })
 
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    await apply_rollups(user_id, "users_transactions", removed=[deleted])
+    await record_deletions(user_id, "users_transactions", [deleted])
+    await invalidate_user_cache(user_id)
+    publish_changes(user_id, "users_transactions", deleted=[deleted])
+
     return {"message": "Transaction deleted successfully"}
@@ -0,0 +1,27 @@
+from typing import Optional
+from pydantic import BaseModel, validator
+from db_utils.amounts import MAX_AMOUNT_MINOR, to_minor
+
+# -------------------- REQUEST AMOUNTS --------------------
+# Base for the create models. Clients send either `amount_minor` (integer
+# cents) or the older float `amount`, which is rounded to the cent. After
+# validation `amount_minor` is always set; sending both is allowed only if
+# they agree.
+
+
+class AmountInput(BaseModel):
+    amount: Optional[float] = None
+    amount_minor: Optional[int] = None
+
+    @validator('amount_minor', always=True)
+    def validate_amount(cls, v, values):
+        amount = values.get('amount')
+        if v is None:
+            if amount is None:
+                raise ValueError("amount or amount_minor is required")
+            return to_minor(amount)
+        if amount is not None and to_minor(amount) != v:
+            raise ValueError("amount and amount_minor disagree")
+        if abs(v) > MAX_AMOUNT_MINOR:
+            raise ValueError("amount_minor is out of range")
+        return v
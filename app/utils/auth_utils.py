@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from functools import lru_cache
+from fastapi import Header, HTTPException, Request, status
+
+# -------------------- CONFIG --------------------
+ENVIRONMENT = os.getenv("ENVIRONMENT", "local")
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", "86400"))
+# Accept the old raw `user-id` header while clients migrate to bearer tokens
+ALLOW_LEGACY_USER_ID_HEADER = os.getenv("ALLOW_LEGACY_USER_ID_HEADER", "false").lower() == "true"
+
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+if not AUTH_SECRET_KEY:
+    if ENVIRONMENT != "local":
+        raise RuntimeError("AUTH_SECRET_KEY must be set outside the local environment")
+    # Local only: tokens stop validating when the process restarts
+    AUTH_SECRET_KEY = secrets.token_urlsafe(32)
+
+_SECRET = AUTH_SECRET_KEY.encode()
+
+
+# -------------------- TOKENS (JWT, HS256) --------------------
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(_SECRET, signing_input.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user_id: str) -> str:
+    now = int(time.time())
+    payload = {"sub": str(user_id), "iat": now, "exp": now + AUTH_TOKEN_TTL_SECONDS}
+    signing_input = f"{_HEADER}.{_b64encode(json.dumps(payload, separators=(',', ':')).encode())}"
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+@lru_cache(maxsize=10000)
+def _decode_token(token: str) -> tuple:
+    # Signature check and parsing are cached; expiry is checked on every call
+    try:
+        header, payload, signature = token.split(".")
+        if header != _HEADER:
+            raise ValueError("unsupported token header")
+        if not hmac.compare_digest(signature, _sign(f"{header}.{payload}")):
+            raise ValueError("bad signature")
+        claims = json.loads(_b64decode(payload))
+        return claims["sub"], claims["exp"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("invalid token")
+
+
+def verify_token(token: str) -> str:
+    try:
+        user_id, expires_at = _decode_token(token)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    if expires_at < time.time():
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
+
+    return user_id
+
+
+# -------------------- DEPENDENCY --------------------
+async def get_current_user_id(
+    request: Request,
+    authorization: str = Header(None),
+    user_id: str = Header(None)
+) -> str:
+    cached = getattr(request.state, "user_id", None)
+    if cached:
+        return cached
+
+    if authorization and authorization.lower().startswith("bearer "):
+        resolved = verify_token(authorization[7:].strip())
+    elif ALLOW_LEGACY_USER_ID_HEADER and user_id:
+        resolved = user_id
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    request.state.user_id = resolved
+    return resolved
@@ -0,0 +1,228 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from pydantic import BaseModel, ValidationError, validator
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from db_utils.get_connection import get_collection
+from db_utils.amounts import AMOUNT_FIELDS
+from db_utils.rollups import apply_rollups, rebuild_rollups
+from db_utils.tombstones import record_deletions
+from app.utils.cache_utils import invalidate_user_cache
+from app.utils.events_utils import publish_changes
+from app.utils.import_utils import format_validation_error
+
+# -------------------- BATCH WRITES --------------------
+# Shared by the per-collection /batch endpoints. Each batch costs one find
+# (for the rollup deltas and PATCH validation) plus one unordered bulk_write,
+# always scoped to the caller's user_id. Each write only applies if the row's
+# updated_at is still what was read; rows changed in between come back as
+# "conflict". Results come back in request order with a status per item
+# instead of failing the whole batch.
+
+MAX_BATCH_SIZE = 1000
+
+
+class BatchUpdateItem(BaseModel):
+    id: str
+    fields: Dict[str, Any]
+
+
+class BatchUpdate(BaseModel):
+    updates: List[BatchUpdateItem]
+
+    @validator('updates')
+    def validate_size(cls, v):
+        if len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f"at most {MAX_BATCH_SIZE} updates per batch")
+        return v
+
+
+class BatchDelete(BaseModel):
+    ids: List[str]
+
+    @validator('ids')
+    def validate_size(cls, v):
+        if len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f"at most {MAX_BATCH_SIZE} ids per batch")
+        return v
+
+
+def _parse_ids(ids: List[str], results: list) -> dict:
+    # Returns {ObjectId: result index}; bad and repeated ids are answered inline
+    parsed = {}
+    for raw in ids:
+        results.append({"id": raw})
+        try:
+            oid = ObjectId(raw)
+        except (InvalidId, TypeError):
+            results[-1]["status"] = "invalid_id"
+            continue
+        if oid in parsed:
+            results[-1]["status"] = "duplicate"
+            continue
+        parsed[oid] = len(results) - 1
+    return parsed
+
+
+async def _fetch_owned(collection, owner: dict, ids) -> dict:
+    if not ids:
+        return {}
+    return {doc["_id"]: doc async for doc in collection.find({"_id": {"$in": list(ids)}, **owner})}
+
+
+async def _bulk_write(collection, ops: list) -> tuple:
+    # (rows matched or deleted, indexes into ops of the writes that failed)
+    if not ops:
+        return 0, set()
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        details = e.details
+        failed = {err["index"] for err in details.get("writeErrors", [])}
+        return details.get("nMatched", 0) + details.get("nRemoved", 0), failed
+    return result.matched_count + result.deleted_count, set()
+
+
+def _as_input(doc: dict, model) -> dict:
+    # Stored document -> model input, so a PATCH is validated as a full row
+    data = {name: doc.get(name) for name in model.model_fields}
+    if isinstance(data.get("date"), datetime):
+        data["date"] = data["date"].isoformat()
+    return data
+
+
+async def batch_update(
+    collection_name: str,
+    user_id: str,
+    owner: dict,
+    updates: List[BatchUpdateItem],
+    model,
+    to_fields: Callable
+) -> list:
+    collection = get_collection(collection_name)
+    results = []
+    parsed = _parse_ids([item.id for item in updates], results)
+    previous = await _fetch_owned(collection, owner, parsed)
+
+    ops, written = [], []
+    now = datetime.utcnow()
+    # Mongo keeps milliseconds; truncated so the re-read below compares equal
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    for oid, index in parsed.items():
+        item, result = updates[index], results[index]
+        prev = previous.get(oid)
+        if prev is None:
+            result["status"] = "not_found"
+            continue
+
+        unknown = set(item.fields) - set(model.model_fields)
+        if unknown:
+            result["status"] = "invalid"
+            result["error"] = f"unknown fields: {', '.join(sorted(unknown))}"
+            continue
+
+        stored = _as_input(prev, model)
+        if set(AMOUNT_FIELDS) & set(item.fields):
+            # amount and amount_minor are one value: patching either replaces both
+            for field in AMOUNT_FIELDS:
+                stored.pop(field, None)
+
+        try:
+            fields = to_fields(model(**{**stored, **item.fields}))
+        except ValidationError as e:
+            result["status"] = "invalid"
+            result["error"] = format_validation_error(e)
+            continue
+        except ValueError as e:
+            result["status"] = "invalid"
+            result["error"] = str(e)
+            continue
+
+        # Only write what actually changed
+        changes = {k: v for k, v in fields.items() if prev.get(k) != v}
+        if not changes:
+            result["status"] = "unchanged"
+            continue
+        changes["updated_at"] = now
+
+        # Only if the row is still as read, so the rollup deltas stay exact
+        ops.append(UpdateOne({"_id": oid, **owner, "updated_at": prev.get("updated_at")}, {"$set": changes}))
+        written.append((result, prev, changes))
+
+    matched, failed = await _bulk_write(collection, ops)
+    current = None
+    if matched < len(ops) - len(failed):
+        # Rows changed since they were read were skipped; see which writes landed
+        current = await _fetch_owned(collection, owner, [prev["_id"] for _, prev, _ in written])
+    added, removed = [], []
+    for i, (result, prev, changes) in enumerate(written):
+        if i in failed:
+            result["status"] = "failed"
+            continue
+        if current is not None and current.get(prev["_id"], {}).get("updated_at") != now:
+            result["status"] = "conflict" if prev["_id"] in current else "not_found"
+            continue
+        result["status"] = "updated"
+        added.append({**prev, **changes})
+        removed.append(prev)
+
+    if added:
+        await apply_rollups(user_id, collection_name, added=added, removed=removed)
+        await invalidate_user_cache(user_id)
+        publish_changes(user_id, collection_name, updated=added)
+
+    return results
+
+
+async def batch_delete(collection_name: str, user_id: str, owner: dict, ids: List[str]) -> list:
+    collection = get_collection(collection_name)
+    results = []
+    parsed = _parse_ids(ids, results)
+    previous = await _fetch_owned(collection, owner, parsed)
+
+    ops, written = [], []
+    for oid, index in parsed.items():
+        prev = previous.get(oid)
+        if prev is None:
+            results[index]["status"] = "not_found"
+            continue
+        ops.append(DeleteOne({"_id": oid, **owner, "updated_at": prev.get("updated_at")}))
+        written.append((results[index], prev))
+
+    deleted, failed = await _bulk_write(collection, ops)
+    current = None
+    if deleted < len(ops) - len(failed):
+        # Rows changed or deleted since they were read. Which of the gone rows
+        # this batch deleted can't be told apart from a concurrent delete, so
+        # the rollups are recomputed instead of applying deltas
+        current = await _fetch_owned(collection, owner, [prev["_id"] for _, prev in written])
+    removed = []
+    for i, (result, prev) in enumerate(written):
+        if i in failed:
+            result["status"] = "failed"
+            continue
+        if current is not None and prev["_id"] in current:
+            result["status"] = "conflict"
+            continue
+        result["status"] = "deleted"
+        removed.append(prev)
+
+    if current is not None:
+        await rebuild_rollups(user_id)
+    elif removed:
+        await apply_rollups(user_id, collection_name, removed=removed)
+    if removed:
+        await record_deletions(user_id, collection_name, removed, skip_recorded=current is not None)
+        await invalidate_user_cache(user_id)
+        publish_changes(user_id, collection_name, deleted=removed)
+
+    return results
+
+
+def summarize(results: list) -> dict:
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"counts": counts, "results": results}
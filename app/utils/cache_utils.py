@@ -0,0 +1,246 @@
+import asyncio
+import functools
+import hashlib
+import importlib
+import os
+import time
+from collections import OrderedDict
+from fastapi import Response
+from pydantic import TypeAdapter
+from app.utils.serialization import dumps
+
+# -------------------- CONFIG --------------------
+# CACHE_BACKEND: "memory" (default), "none", or "package.module:ClassName"
+# for a custom CacheBackend. The in-memory backend is per worker process;
+# with several workers, writes only invalidate the worker that served them,
+# so other workers may serve entries up to CACHE_TTL_SECONDS old.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Bumped on an invalidation that races a fill, so that fill is not stored.
+# Only users with a fill in flight have an entry.
+_generations = {}
+
+cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "coalesced": 0,
+    "not_modified": 0,
+    "invalidations": 0,
+}
+
+# Single flight: (user_id, key, generation) -> task computing the body
+_inflight = {}
+_coalesced_by_route = {}
+
+
+# -------------------- BACKENDS --------------------
+class CacheBackend:
+    async def get(self, user_id: str, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, user_id: str, key: str, value: bytes, ttl: int):
+        raise NotImplementedError
+
+    async def invalidate(self, user_id: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullCacheBackend(CacheBackend):
+    async def get(self, user_id, key):
+        return None
+
+    async def set(self, user_id, key, value, ttl):
+        pass
+
+    async def invalidate(self, user_id):
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    # LRU over (user_id, key) bounded by entry count and total bytes
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._bytes = 0
+        self.evictions = 0
+
+    def _remove(self, entry_key):
+        _, value = self._entries.pop(entry_key)
+        self._bytes -= len(value)
+        keys = self._user_keys.get(entry_key[0])
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._user_keys[entry_key[0]]
+
+    async def get(self, user_id, key):
+        entry_key = (user_id, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(entry_key)
+            return None
+        self._entries.move_to_end(entry_key)
+        return value
+
+    async def set(self, user_id, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        entry_key = (user_id, key)
+        if entry_key in self._entries:
+            self._remove(entry_key)
+        self._entries[entry_key] = (time.monotonic() + ttl, value)
+        self._user_keys.setdefault(user_id, set()).add(entry_key)
+        self._bytes += len(value)
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def invalidate(self, user_id):
+        for entry_key in list(self._user_keys.get(user_id, ())):
+            self._remove(entry_key)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+def _load_backend(name: str) -> CacheBackend:
+    if name == "memory":
+        return InMemoryCacheBackend()
+    if name == "none":
+        return NullCacheBackend()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+cache_backend = _load_backend(CACHE_BACKEND)
+
+
+def set_cache_backend(backend: CacheBackend):
+    global cache_backend
+    cache_backend = backend
+
+
+# -------------------- ETAGS --------------------
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+# -------------------- DECORATOR --------------------
+# Wrap a GET endpoint that declares `request: Request` and `user_id`.
+# Responses are cached per user and query string, revalidated with ETag /
+# If-None-Match, and dropped by invalidate_user_cache() on that user's writes.
+# revalidate=False skips the response-model pass for endpoints that already
+# shape their output with serialize_doc().
+#
+# Concurrent misses for the same user and query share one computation
+# (single flight, per worker), even with CACHE_BACKEND=none. The fill runs
+# as its own task, so a caller that disconnects doesn't cancel it for the
+# others; a write in the meantime starts a new flight for later callers.
+def cached_response(response_model=None, revalidate: bool = True):
+    adapter = TypeAdapter(response_model) if response_model is not None and revalidate else None
+
+    def decorator(endpoint):
+        async def fill(user_id, key, generation, args, kwargs) -> bytes:
+            data = await endpoint(*args, **kwargs)
+            if adapter is not None:
+                data = adapter.dump_python(adapter.validate_python(data), mode="json", by_alias=True)
+            body = dumps(data)
+            if _generations.get(user_id, 0) == generation:
+                await cache_backend.set(user_id, key, body, CACHE_TTL_SECONDS)
+            return body
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs["request"]
+            user_id = str(kwargs["user_id"])
+            key = f"{request.url.path}?{request.url.query}"
+
+            body = await cache_backend.get(user_id, key)
+            if body is None:
+                generation = _generations.get(user_id, 0)
+                flight_key = (user_id, key, generation)
+                task = _inflight.get(flight_key)
+                if task is None:
+                    cache_stats["misses"] += 1
+                    task = asyncio.ensure_future(fill(user_id, key, generation, args, kwargs))
+                    _inflight[flight_key] = task
+                    task.add_done_callback(functools.partial(_flight_done, flight_key))
+                else:
+                    cache_stats["coalesced"] += 1
+                    route = request.url.path
+                    _coalesced_by_route[route] = _coalesced_by_route.get(route, 0) + 1
+                body = await asyncio.shield(task)
+            else:
+                cache_stats["hits"] += 1
+
+            etag = make_etag(body)
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                cache_stats["not_modified"] += 1
+                return Response(status_code=304, headers=headers)
+
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        return wrapper
+
+    return decorator
+
+
+def _has_inflight(user_id: str) -> bool:
+    return any(flight_key[0] == user_id for flight_key in _inflight)
+
+
+def _flight_done(flight_key, task):
+    _inflight.pop(flight_key, None)
+    if not _has_inflight(flight_key[0]):
+        _generations.pop(flight_key[0], None)
+    # Mark a failure as retrieved even if every caller went away
+    if not task.cancelled():
+        task.exception()
+
+
+async def invalidate_user_cache(user_id):
+    user_id = str(user_id)
+    cache_stats["invalidations"] += 1
+    if _has_inflight(user_id):
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+    await cache_backend.invalidate(user_id)
+
+
+def get_cache_stats() -> dict:
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        "backend": type(cache_backend).__name__,
+        "ttl_seconds": CACHE_TTL_SECONDS,
+        **cache_stats,
+        "hit_ratio": cache_stats["hits"] / lookups if lookups else 0,
+        "in_flight": len(_inflight),
+        "generations": len(_generations),
+        "coalesced_by_route": dict(_coalesced_by_route),
+        **cache_backend.stats(),
+    }
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import os
+import secrets
+from collections import OrderedDict, defaultdict, deque
+from pymongo.errors import OperationFailure, PyMongoError
+from db_utils import get_connection
+from app.utils.serialization import dumps, serialize_doc
+
+# -------------------- CONFIG --------------------
+# CHANGE_FEED_BACKEND:
+#   "memory" (default) - in-process pub/sub fed by the write endpoints. Only
+#                        sees writes made by this worker process.
+#   "changestream"     - one Mongo change stream per worker process, fanned
+#                        out to its subscribers. Needs a replica set; deletes
+#                        are routed by pre-images, which enable_change_feed()
+#                        turns on for the feed collections.
+CHANGE_FEED_BACKEND = os.getenv("CHANGE_FEED_BACKEND", "memory")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "200"))
+# Users whose recent events are kept for replay; the least recently active go first
+EVENTS_HISTORY_USERS = int(os.getenv("EVENTS_HISTORY_USERS", "10000"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Wait before reopening the change stream after an error, doubling up to the max
+CHANGE_STREAM_RETRY_SECONDS = float(os.getenv("CHANGE_STREAM_RETRY_SECONDS", "1"))
+CHANGE_STREAM_MAX_RETRY_SECONDS = float(os.getenv("CHANGE_STREAM_MAX_RETRY_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+FEED_COLLECTIONS = ["users_transactions", "users_business_profit", "founders_transactions"]
+
+HEARTBEAT_FRAME = b": keep-alive\n\n"
+# Sent when events were lost (slow client, expired or foreign resume token):
+# the client should reload its lists once and keep listening
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+def _frame(event_id: str, payload: dict) -> bytes:
+    return b"id: " + event_id.encode() + b"\nevent: change\ndata: " + dumps(payload) + b"\n\n"
+
+
+def _feed_fields() -> dict:
+    # collection -> response fields, shared with delta sync so `doc` has the
+    # same shape as its rows. Imported on first use: the endpoints import this module
+    from app.endpoints.sync_endpoint import SYNC_SOURCES
+    return SYNC_SOURCES
+
+
+def _event(op: str, collection_name: str, doc_id, doc: dict | None = None) -> dict:
+    event = {"op": op, "collection": collection_name, "id": str(doc_id)}
+    if doc is not None:
+        event["doc"] = serialize_doc(doc, _feed_fields()[collection_name])
+    return event
+
+
+# -------------------- IN-PROCESS FEED --------------------
+# Each subscriber gets a bounded queue. A subscriber that falls
+# EVENTS_QUEUE_SIZE events behind is not waited for: its queue is dropped and
+# it gets a reset instead, so one slow dashboard never blocks writers. Recent
+# events are kept for the EVENTS_HISTORY_USERS most recently active users so
+# a reconnect with Last-Event-ID replays the gap.
+
+class _Subscriber:
+    __slots__ = ("queue", "overflowed")
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class MemoryChangeFeed:
+    def __init__(self, replay_size: int = EVENTS_REPLAY_SIZE, history_users: int = EVENTS_HISTORY_USERS):
+        # Event ids are "<epoch>-<seq>"; a new process never honours old ids
+        self._epoch = secrets.token_hex(4)
+        self._seq = 0
+        self._replay_size = replay_size
+        self._history_users = history_users
+        self._subscribers = defaultdict(set)
+        self._history = OrderedDict()
+        # Highest seq dropped with an evicted user's history: older ids may have gaps
+        self._evicted_seq = 0
+
+    def publish(self, user_id: str, events: list):
+        self._deliver(str(user_id), events)
+
+    def _user_history(self, user_id: str) -> deque:
+        history = self._history.get(user_id)
+        if history is None:
+            history = self._history[user_id] = deque(maxlen=self._replay_size)
+            while len(self._history) > self._history_users:
+                _, evicted = self._history.popitem(last=False)
+                if evicted:
+                    self._evicted_seq = max(self._evicted_seq, evicted[-1][0])
+        else:
+            self._history.move_to_end(user_id)
+        return history
+
+    def _deliver(self, user_id: str, events: list):
+        history = self._user_history(user_id)
+        subscribers = self._subscribers.get(user_id, ())
+        for event in events:
+            self._seq += 1
+            frame = _frame(f"{self._epoch}-{self._seq}", event)
+            history.append((self._seq, frame))
+            for sub in subscribers:
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+
+    def _replay(self, user_id: str, last_event_id: str | None) -> list | None:
+        # Frames after last_event_id, or None when the gap can't be replayed
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+
+        history = self._history.get(user_id)
+        # Events after seq may have been dropped: by the history filling up,
+        # or with the whole history when this user was evicted
+        may_have_dropped = seq < self._evicted_seq or (history and len(history) == self._replay_size)
+        if may_have_dropped and (not history or history[0][0] > seq + 1):
+            return None
+        if not history:
+            return []
+        return [frame for s, frame in history if s > seq]
+
+    async def stream(self, user_id: str, last_event_id: str | None = None):
+        sub = _Subscriber()
+        subscribers = self._subscribers[user_id]
+        subscribers.add(sub)
+        try:
+            # Subscribed before replaying, with no await in between: no gaps, no repeats
+            replay = self._replay(user_id, last_event_id)
+            if replay is None:
+                yield RESET_FRAME
+            else:
+                for frame in replay:
+                    yield frame
+
+            while True:
+                if sub.overflowed:
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.overflowed = False
+                    yield RESET_FRAME
+                    continue
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    continue
+                yield frame
+        finally:
+            subscribers.discard(sub)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "users_subscribed": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "users_with_history": len(self._history),
+            "events_published": self._seq,
+        }
+
+    def reset_all(self):
+        # Every subscriber missed events: start a new epoch and send resets
+        self._epoch = secrets.token_hex(4)
+        self._history.clear()
+        for subscribers in self._subscribers.values():
+            for sub in subscribers:
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait(RESET_FRAME)
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+
+
+# -------------------- CHANGE STREAM FEED --------------------
+# One change stream per worker, opened with the first subscriber and kept
+# open. Changes are routed by owner to the same per-user queues and replay
+# history as the in-process feed, so event ids are "<epoch>-<seq>" too and a
+# reconnect to another worker gets a reset. If the stream can't be resumed,
+# every subscriber gets a reset.
+
+CHANGE_PIPELINE = [{"$match": {
+    "ns.coll": {"$in": FEED_COLLECTIONS},
+    "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+}}]
+
+
+class ChangeStreamFeed(MemoryChangeFeed):
+    def __init__(self):
+        super().__init__()
+        self._watcher = None
+        self._stream_errors = 0
+
+    def publish(self, user_id: str, events: list):
+        # Writes reach subscribers through the change stream itself
+        pass
+
+    async def enable(self):
+        db = get_connection.connect()[get_connection.DB_NAME]
+        for collection_name in FEED_COLLECTIONS:
+            await db.command({
+                "collMod": collection_name,
+                "changeStreamPreAndPostImages": {"enabled": True}
+            })
+
+    def stream(self, user_id: str, last_event_id: str | None = None):
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+        return super().stream(user_id, last_event_id)
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self):
+        db = get_connection.connect()[get_connection.DB_NAME]
+        resume_token = None
+        retry = CHANGE_STREAM_RETRY_SECONDS
+        while True:
+            try:
+                async with db.watch(
+                    CHANGE_PIPELINE,
+                    full_document="updateLookup",
+                    full_document_before_change="whenAvailable",
+                    resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = change["_id"]
+                        retry = CHANGE_STREAM_RETRY_SECONDS
+                        self._dispatch(change)
+            except OperationFailure as e:
+                # Also raised for an expired resume token: changes since are lost
+                self._stream_errors += 1
+                logger.warning("change stream failed, retrying in %.0fs: %s", retry, e)
+                if resume_token is not None:
+                    resume_token = None
+                    self.reset_all()
+            except PyMongoError as e:
+                # The driver already retried once; try again from the last change
+                self._stream_errors += 1
+                logger.warning("change stream interrupted, retrying in %.0fs: %s", retry, e)
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, CHANGE_STREAM_MAX_RETRY_SECONDS)
+
+    def _dispatch(self, change: dict):
+        owner_doc = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+        if owner_doc.get("user_id") is None:
+            return
+        op = "update" if change["operationType"] == "replace" else change["operationType"]
+        doc = change.get("fullDocument") if op != "delete" else None
+        event = _event(op, change["ns"]["coll"], change["documentKey"]["_id"], doc)
+        self._deliver(str(owner_doc["user_id"]), [event])
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "backend": "changestream",
+            "stream_open": self._watcher is not None and not self._watcher.done(),
+            "stream_errors": self._stream_errors,
+        }
+
+
+change_feed = ChangeStreamFeed() if CHANGE_FEED_BACKEND == "changestream" else MemoryChangeFeed()
+
+
+# -------------------- WRITE HOOK --------------------
+def publish_changes(
+    user_id,
+    collection_name: str,
+    inserted: list | None = None,
+    updated: list | None = None,
+    deleted: list | None = None
+):
+    # Called by the write endpoints with the documents as stored
+    events = [_event("insert", collection_name, doc["_id"], doc) for doc in inserted or []]
+    events += [_event("update", collection_name, doc["_id"], doc) for doc in updated or []]
+    events += [_event("delete", collection_name, doc["_id"]) for doc in deleted or []]
+    if events:
+        change_feed.publish(str(user_id), events)
+
+
+async def enable_change_feed():
+    if isinstance(change_feed, ChangeStreamFeed):
+        await change_feed.enable()
+
+
+async def close_change_feed():
+    if isinstance(change_feed, ChangeStreamFeed):
+        await change_feed.close()
+
+
+def get_change_feed_stats() -> dict:
+    return change_feed.stats()
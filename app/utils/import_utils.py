@@ -0,0 +1,155 @@
+import codecs
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator
+from pydantic import ValidationError
+
+# -------------------- STREAM PARSING --------------------
+# Uploads are parsed line by line straight off the request body, so memory
+# stays bounded by the chunk size and MAX_RECORD_LENGTH rather than the file
+# size.
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Longest line or (multi-line) CSV record held while parsing; longer ones
+# are reported as bad rows
+MAX_RECORD_LENGTH = 64 * 1024
+
+
+def detect_format(fmt: str | None, content_type: str | None) -> str | None:
+    if fmt:
+        return fmt.lower() if fmt.lower() in ("csv", "ndjson") else None
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if content_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | None]:
+    # A line longer than MAX_RECORD_LENGTH is dropped as it streams in and
+    # yielded as None, so the parsers can report it as a bad row
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    skipping = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if skipping or len(line) > MAX_RECORD_LENGTH:
+                skipping = False
+                yield None
+            else:
+                yield line.rstrip("\r")
+        if len(buffer) > MAX_RECORD_LENGTH:
+            skipping, buffer = True, ""
+    buffer += decoder.decode(b"", final=True)
+    if skipping or len(buffer) > MAX_RECORD_LENGTH:
+        yield None
+    elif buffer:
+        yield buffer.rstrip("\r")
+
+
+async def _csv_records(lines: AsyncIterator[str | None]) -> AsyncIterator[tuple]:
+    # Joins lines into CSV records, as quoted fields may span lines. Yields
+    # (record, None) or (None, error). A record that grows past
+    # MAX_RECORD_LENGTH or never closes its quotes (usually one stray '"')
+    # costs only its first line: the lines after it are read again.
+    source = lines.__aiter__()
+    replay = deque()
+    pending, length, in_quotes = [], 0, False
+
+    while True:
+        if replay:
+            line = replay.popleft()
+        else:
+            try:
+                line = await source.__anext__()
+            except StopAsyncIteration:
+                if not pending:
+                    return
+                yield None, "unterminated quoted field"
+                replay.extend(pending[1:])
+                pending, length, in_quotes = [], 0, False
+                continue
+
+        if line is None:
+            if pending:
+                # An oversized line can't close the open record either
+                yield None, f"record longer than {MAX_RECORD_LENGTH} characters"
+                replay.appendleft(None)
+                replay.extendleft(reversed(pending[1:]))
+                pending, length, in_quotes = [], 0, False
+            else:
+                yield None, f"line longer than {MAX_RECORD_LENGTH} characters"
+            continue
+
+        pending.append(line)
+        length += len(line) + 1
+        # An odd number of quotes opens or closes a quoted field
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            yield "\n".join(pending), None
+            pending, length = [], 0
+        elif length > MAX_RECORD_LENGTH:
+            yield None, f"record longer than {MAX_RECORD_LENGTH} characters"
+            replay.extendleft(reversed(pending[1:]))
+            pending, length, in_quotes = [], 0, False
+
+
+async def iter_csv_rows(lines: AsyncIterator[str | None]) -> AsyncIterator[tuple]:
+    # Yields (row_number, dict | error message); the header row is not counted
+    header = None
+    row_number = 0
+
+    async for record, error in _csv_records(lines):
+        if error:
+            row_number += 1
+            yield row_number, error
+            continue
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not provided" for optional fields
+        yield row_number, {k: (v if v != "" else None) for k, v in zip(header, values)}
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str | None]) -> AsyncIterator[tuple]:
+    row_number = 0
+    async for line in lines:
+        if line is None:
+            row_number += 1
+            yield row_number, f"line longer than {MAX_RECORD_LENGTH} characters"
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, f"invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, "expected a JSON object"
+            continue
+        yield row_number, row
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
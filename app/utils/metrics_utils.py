@@ -0,0 +1,144 @@
+import bisect
+import time
+from db_utils.command_metrics import DbStats, current_db_stats
+from app.utils.cache_utils import get_cache_stats
+
+# -------------------- REGISTRY --------------------
+# Per (method, route template) series, kept in-process and rendered in the
+# Prometheus text format by render_metrics().
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "bucket_counts", "latency_sum", "count",
+                 "db_round_trips", "db_time", "db_documents", "response_bytes")
+
+    def __init__(self):
+        self.statuses = {}
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.db_round_trips = 0
+        self.db_time = 0.0
+        self.db_documents = 0
+        self.response_bytes = 0
+
+
+_routes = {}
+
+
+def _record(method: str, route: str, status: int, elapsed: float, db: DbStats, response_bytes: int):
+    metrics = _routes.get((method, route))
+    if metrics is None:
+        metrics = _routes[(method, route)] = RouteMetrics()
+    metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+    metrics.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    metrics.latency_sum += elapsed
+    metrics.count += 1
+    metrics.db_round_trips += db.round_trips
+    metrics.db_time += db.time_seconds
+    metrics.db_documents += db.documents
+    metrics.response_bytes += response_bytes
+
+
+# -------------------- MIDDLEWARE --------------------
+# Plain ASGI (no BaseHTTPMiddleware) to keep per-request overhead small.
+# Adds a Server-Timing header with total and DB time up to the moment the
+# response starts; streamed bodies keep accruing DB time in /metrics only.
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        db = DbStats()
+        token = current_db_stats.set(db)
+        status = 500
+        response_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f"app;dur={app_ms:.1f}, "
+                    f'db;dur={db.time_seconds * 1000:.1f};desc="{db.round_trips} round trips"'
+                )
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", timing.encode())]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            current_db_stats.reset(token)
+            route = scope.get("route")
+            _record(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - started,
+                db,
+                response_bytes
+            )
+
+
+# -------------------- PROMETHEUS EXPOSITION --------------------
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def render_metrics() -> str:
+    # Snapshot: requests on the event loop keep adding routes and statuses
+    routes = list(_routes.items())
+    lines = [
+        "# HELP fintrack_http_requests_total Requests served, by route template and status.",
+        "# TYPE fintrack_http_requests_total counter",
+    ]
+    for (method, route), m in routes:
+        for status, count in list(m.statuses.items()):
+            lines.append(f"fintrack_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP fintrack_http_request_duration_seconds Request latency.",
+        "# TYPE fintrack_http_request_duration_seconds histogram",
+    ]
+    for (method, route), m in routes:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), m.bucket_counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(
+                f"fintrack_http_request_duration_seconds_bucket{_labels(method=method, route=route, le=le)} {cumulative}"
+            )
+        lines.append(f"fintrack_http_request_duration_seconds_sum{_labels(method=method, route=route)} {m.latency_sum}")
+        lines.append(f"fintrack_http_request_duration_seconds_count{_labels(method=method, route=route)} {m.count}")
+
+    counters = [
+        ("fintrack_db_round_trips_total", "Mongo commands issued while serving the route.", "db_round_trips"),
+        ("fintrack_db_time_seconds_total", "Time spent in Mongo commands.", "db_time"),
+        ("fintrack_db_documents_returned_total", "Documents returned by Mongo.", "db_documents"),
+        ("fintrack_http_response_bytes_total", "Response body bytes sent.", "response_bytes"),
+    ]
+    for name, help_text, attr in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (method, route), m in routes:
+            lines.append(f"{name}{_labels(method=method, route=route)} {getattr(m, attr)}")
+
+    lines += [
+        "# HELP fintrack_coalesced_requests_total Reads served by joining an identical in-flight request.",
+        "# TYPE fintrack_coalesced_requests_total counter",
+    ]
+    for route, count in get_cache_stats()["coalesced_by_route"].items():
+        lines.append(f"fintrack_coalesced_requests_total{_labels(route=route)} {count}")
+
+    return "\n".join(lines) + "\n"
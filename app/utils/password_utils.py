@@ -0,0 +1,138 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# -------------------- HASH POLICY --------------------
+# Changing the scheme or rounds takes effect on the next successful login:
+# verify_password() returns a fresh hash for anything not matching the policy.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "sha256_crypt")
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "535000"))
+
+# Schemes existing hashes may still use; anything but the configured one is deprecated
+KNOWN_SCHEMES = ["sha256_crypt", "sha512_crypt", "pbkdf2_sha256"]
+
+pwd_context = CryptContext(
+    schemes=[PASSWORD_HASH_SCHEME] + [s for s in KNOWN_SCHEMES if s != PASSWORD_HASH_SCHEME],
+    deprecated="auto",
+    **{
+        f"{PASSWORD_HASH_SCHEME}__default_rounds": PASSWORD_HASH_ROUNDS,
+        f"{PASSWORD_HASH_SCHEME}__min_rounds": PASSWORD_HASH_ROUNDS,
+        f"{PASSWORD_HASH_SCHEME}__max_rounds": PASSWORD_HASH_ROUNDS,
+    }
+)
+
+# -------------------- EXECUTOR --------------------
+# passlib's builtin sha256_crypt backend is pure Python and holds the GIL,
+# so a process pool is the default; "thread" is available for fast schemes.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "100"))
+
+_executor = None
+_semaphore = None
+
+hashing_stats = {
+    "in_flight": 0,
+    "queued": 0,
+    "max_queued": 0,
+    "completed": 0,
+    "rejected": 0,
+    "rehashed": 0,
+    "total_wait_seconds": 0.0,
+    "total_hash_seconds": 0.0,
+}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+
+def shutdown_hashing():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+async def _run(fn, *args):
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+
+    if hashing_stats["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+        hashing_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests, retry shortly"
+        )
+
+    queued_at = time.perf_counter()
+    hashing_stats["queued"] += 1
+    hashing_stats["max_queued"] = max(hashing_stats["max_queued"], hashing_stats["queued"])
+    try:
+        await _semaphore.acquire()
+    finally:
+        hashing_stats["queued"] -= 1
+
+    started_at = time.perf_counter()
+    hashing_stats["in_flight"] += 1
+    hashing_stats["total_wait_seconds"] += started_at - queued_at
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _semaphore.release()
+        hashing_stats["in_flight"] -= 1
+        hashing_stats["completed"] += 1
+        hashing_stats["total_hash_seconds"] += time.perf_counter() - started_at
+
+
+# -------------------- PUBLIC API --------------------
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> tuple:
+    # Returns (is_valid, new_hash); new_hash is set when the stored hash is outdated
+    valid, new_hash = await _run(_verify_and_update, password, hashed)
+    if new_hash:
+        hashing_stats["rehashed"] += 1
+    return valid, new_hash
+
+
+def get_hashing_stats() -> dict:
+    completed = hashing_stats["completed"]
+    return {
+        "scheme": PASSWORD_HASH_SCHEME,
+        "rounds": PASSWORD_HASH_ROUNDS,
+        "executor": PASSWORD_HASH_EXECUTOR,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        **hashing_stats,
+        "avg_wait_seconds": hashing_stats["total_wait_seconds"] / completed if completed else 0,
+        "avg_hash_seconds": hashing_stats["total_hash_seconds"] / completed if completed else 0,
+    }
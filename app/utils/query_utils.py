@@ -0,0 +1,136 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import HTTPException
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+# -------------------- DATE RANGE --------------------
+def parse_query_date(value: str, field: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{field}' date format")
+
+
+def date_range_filter(date_from: Optional[str], date_to: Optional[str]) -> Optional[dict]:
+    # `to` is inclusive: a bare YYYY-MM-DD covers the whole day
+    date_filter = {}
+    if date_from:
+        date_filter["$gte"] = parse_query_date(date_from, "from")
+    if date_to:
+        end = parse_query_date(date_to, "to")
+        if len(date_to) == 10:
+            date_filter["$lt"] = end + timedelta(days=1)
+        else:
+            date_filter["$lte"] = end
+    return date_filter or None
+
+
+def parse_timezone(tz: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+
+
+def local_date_range_filter(date_from: Optional[str], date_to: Optional[str], zone: ZoneInfo) -> Optional[dict]:
+    # from/to are wall-clock times in `zone`; stored dates are naive UTC
+    date_filter = date_range_filter(date_from, date_to)
+    if date_filter:
+        for op, bound in date_filter.items():
+            if bound.tzinfo is None:
+                bound = bound.replace(tzinfo=zone)
+            date_filter[op] = bound.astimezone(timezone.utc).replace(tzinfo=None)
+    return date_filter
+
+
+# -------------------- SPARSE FIELDSETS --------------------
+def parse_fields(requested: Optional[str], available: tuple, always: tuple = ("_id",)) -> tuple:
+    # ?fields=date,amount -> those fields (plus `always`) in `available` order
+    if not requested:
+        return available
+    names = {name.strip() for name in requested.split(",") if name.strip()}
+    unknown = names - set(available)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in available if field in names or field in always)
+
+
+# -------------------- KEYSET CURSOR --------------------
+# Cursors are opaque to clients: base64url(JSON) of the last row's (date, _id)
+
+def encode_cursor(doc: dict) -> str:
+    date_val = doc.get("date")
+    payload = {
+        "d": date_val.isoformat() if isinstance(date_val, datetime) else date_val,
+        "s": isinstance(date_val, str),
+        "i": str(doc["_id"]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        date_val = payload["d"]
+        if date_val is not None and not payload["s"]:
+            date_val = datetime.fromisoformat(date_val)
+        return date_val, ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(cursor: str) -> dict:
+    # Rows strictly after the cursor in (date desc, _id desc) order. The sort
+    # spans BSON types (dates, then legacy string dates, then no date) but $lt
+    # only compares within one, so the types below the cursor's are added
+    date_val, last_id = decode_cursor(cursor)
+    if date_val is None:
+        return {"date": None, "_id": {"$lt": last_id}}
+
+    after = [
+        {"date": {"$lt": date_val}},
+        {"date": date_val, "_id": {"$lt": last_id}},
+    ]
+    if isinstance(date_val, datetime):
+        after.append({"date": {"$type": "string"}})
+    after.append({"date": None})
+    return {"$or": after}
+
+
+# -------------------- SYNC WATERMARK --------------------
+# Opaque to clients: base64url(JSON) of one (timestamp, _id) position per
+# synced collection. Clients send back the next_since they were given.
+
+def encode_sync_token(positions: dict) -> str:
+    payload = {name: [ts.isoformat(), str(oid)] for name, (ts, oid) in positions.items()}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        return {
+            name: (datetime.fromisoformat(ts), ObjectId(oid))
+            for name, (ts, oid) in payload.items()
+        }
+    except (ValueError, TypeError, AttributeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def after_position(field: str, ts: datetime, oid: ObjectId, until: datetime) -> dict:
+    # Rows strictly after (ts, oid) in (field asc, _id asc) order, up to `until`
+    return {
+        "$or": [
+            {field: {"$gt": ts, "$lte": until}},
+            {field: ts, "_id": {"$gt": oid}},
+        ]
+    }
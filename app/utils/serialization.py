@@ -0,0 +1,53 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+# -------------------- BSON → JSON (ONE PASS) --------------------
+# Picks the requested fields from a Mongo document in a single comprehension
+# and turns `date` fields into YYYY-MM-DD. ObjectIds and other datetimes are
+# left for dumps() to encode natively, which is far cheaper than converting
+# them in Python. Missing fields become None and unlisted fields are dropped,
+# so the result already has the shape of the response model.
+
+def serialize_doc(doc: dict, fields: tuple, date_fields: tuple = ("date",)) -> dict:
+    get = doc.get
+    out = {field: get(field) for field in fields}
+    for field in date_fields:
+        value = out.get(field)
+        if type(value) is datetime:
+            out[field] = value.date().isoformat()
+    return out
+
+
+def projection(fields: tuple) -> dict:
+    return {field: 1 for field in fields}
+
+
+# -------------------- ENCODER --------------------
+def _default(value):
+    if type(value) is ObjectId:
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(
+        data,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
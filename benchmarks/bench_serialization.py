@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.endpoints.users_transactions_endpoint import TransactionResponse, TRANSACTION_FIELDS
+from app.utils.serialization import serialize_doc, dumps, orjson
+
+# Usage: python -m benchmarks.bench_serialization [rows]
+# Compares the old list-endpoint serialization (per-doc mutation loop,
+# response-model revalidation, stdlib JSON) with serialize_doc() + dumps().
+
+ROWS = 50_000
+REPEATS = 5
+
+
+def make_ledger(rows: int) -> list:
+    random.seed(0)
+    user_id = str(ObjectId())
+    start = datetime(2015, 1, 1)
+    now = datetime(2026, 1, 1, 12, 30, 15, 250000)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "type": random.choice(["income", "expense"]),
+            "amount": round(random.uniform(1, 5000), 2),
+            "date": start + timedelta(hours=i),
+            "category": random.choice(["rent", "sales", "salary", "tools", "travel"]),
+            "details": "synthetic row",
+            "payee": random.choice([None, "Utkarsh", "Umang", "Business"]),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+def old_pipeline(docs: list) -> bytes:
+    adapter = TypeAdapter(List[TransactionResponse])
+    transactions = []
+    for txn in docs:
+        txn = dict(txn)
+        txn["_id"] = str(txn["_id"])
+        txn["user_id"] = str(txn["user_id"])
+        if isinstance(txn.get("date"), datetime):
+            txn["date"] = txn["date"].date().isoformat()
+        transactions.append(txn)
+    data = adapter.dump_python(adapter.validate_python(transactions), mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def new_pipeline(docs: list) -> bytes:
+    return dumps([serialize_doc(txn, TRANSACTION_FIELDS) for txn in docs])
+
+
+def best_of(fn, docs) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(docs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows: int = ROWS):
+    docs = make_ledger(rows)
+    assert json.loads(old_pipeline(docs[:100])) == json.loads(new_pipeline(docs[:100]))
+
+    old = best_of(old_pipeline, docs)
+    new = best_of(new_pipeline, docs)
+    print(f"rows: {rows}, encoder: {'orjson' if orjson else 'stdlib json'}")
+    print(f"old pipeline: {old * 1000:8.1f} ms")
+    print(f"new pipeline: {new * 1000:8.1f} ms  ({old / new:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,19 @@
+# -------------------- MONGOMOCK COMPATIBILITY --------------------
+# Shared by the offline benchmark backend and the tests.
+
+
+def patch_mongomock():
+    # pymongo >= 4.11 passes sort= to bulk write builders, which mongomock
+    # does not accept yet; drop it (the app never sorts bulk writes).
+    import mongomock.collection as mongomock_collection
+    builder = mongomock_collection.BulkOperationBuilder
+    if getattr(builder, "_sort_dropped", False):
+        return
+    for name in ("add_update", "add_replace"):
+        original = getattr(builder, name)
+
+        def patched(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        setattr(builder, name, patched)
+    builder._sort_dropped = True
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Usage:
+#   python -m benchmarks.run --scale 1k                       # offline, mongomock-motor
+#   python -m benchmarks.run --scale 100k --backend mongod --mongo-url mongodb://localhost:27017
+#   python -m benchmarks.run --scale 1k --output base.json
+#   python -m benchmarks.run --scale 1k --compare base.json   # diff against an earlier run
+#
+# Seeds a synthetic ledger, drives every router in main.py through an ASGI
+# client and reports throughput and p50/p95/p99 latency per endpoint.
+# mongomock-motor is fine up to ~100k rows; use a local mongod for 1m.
+
+BENCH_DB_NAME = "fintrack_bench"
+
+
+# -------------------- SCENARIOS --------------------
+# (method, path, params, json body); login and the batch writes are limited
+# separately since each request runs a full password hash or BATCH_ITEMS writes.
+SCENARIOS = [
+    ("GET", "/", None, None),
+    ("GET", "/api/ping", None, None),
+    ("POST", "/api/auth/login", None, "login"),
+    ("GET", "/api/users/users", None, None),
+    ("GET", "/api/users-finances/", None, None),
+    ("GET", "/api/users-transactions/", {"limit": 100}, None),
+    ("GET", "/api/users-transactions/", {"limit": 500, "type": "expense"}, None),
+    ("GET", "/api/users-transactions/", {"limit": 500, "fields": "date,amount"}, None),
+    ("GET", "/api/users-transactions/", {"paginate": "false"}, None),
+    ("POST", "/api/users-transactions/", None, "transaction"),
+    ("GET", "/api/users-business-profit/", None, None),
+    ("GET", "/api/founders-transactions/", None, None),
+    ("GET", "/api/founders-transactions/summary", None, None),
+    ("GET", "/api/export/", {"format": "ndjson"}, None),
+    ("GET", "/api/system/db-pool", None, None),
+    ("GET", "/api/users-business-profit/series", None, None),
+    ("GET", "/api/users-transactions/cashflow", None, None),
+    ("GET", "/api/users-transactions/cashflow", {"source": "rollups", "split": "none"}, None),
+    ("GET", "/api/sync/", {"limit": 500}, None),
+    # Last: these write to the ledger
+    ("PATCH", "/api/users-transactions/batch", None, "batch_update"),
+    ("POST", "/api/users-transactions/batch/delete", None, "batch_delete"),
+]
+
+# Need aggregation operators mongomock lacks ($dateTrunc); skipped on that backend
+MONGOD_ONLY = {
+    "GET /api/users-business-profit/series",
+    "GET /api/users-transactions/cashflow",
+}
+
+# Rows per batch request
+BATCH_ITEMS = 50
+BATCH_REQUESTS = 50
+
+LOGIN_REQUESTS = 20
+
+
+def _body(kind: str, email: str):
+    if kind == "login":
+        return {"email": email, "password": "bench-password"}
+    if kind == "transaction":
+        return {"type": "expense", "amount": 12.5, "date": "2025-06-01", "category": "tools"}
+    return None
+
+
+async def _batch_body(db, user_id: str, kind: str, requests: int):
+    # Callables, so every request writes something: updates alternate the
+    # amount of the same rows, deletes remove rows inserted for them
+    from bson import ObjectId
+    from db_utils.amounts import amount_fields
+    from db_utils.rollups import rebuild_rollups
+
+    collection = db.users_transactions
+    if kind == "batch_update":
+        cursor = collection.find({"user_id": ObjectId(user_id)}, {"_id": 1}).limit(BATCH_ITEMS)
+        ids = [str(doc["_id"]) async for doc in cursor]
+        calls = itertools.count()
+
+        def update_body():
+            amount_minor = 1000 + next(calls) % 2
+            return {"updates": [{"id": i, "fields": {"amount_minor": amount_minor}} for i in ids]}
+        return update_body
+
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": ObjectId(user_id), "type": "expense", **amount_fields(100), "date": now,
+         "category": "bench-delete", "created_at": now, "updated_at": now}
+        for _ in range((requests + 1) * BATCH_ITEMS)
+    ]
+    await collection.insert_many(rows)
+    await rebuild_rollups(user_id)
+    ids = iter([str(row["_id"]) for row in rows])
+    return lambda: {"ids": list(itertools.islice(ids, BATCH_ITEMS))}
+
+
+def _scenario_name(method, path, params) -> str:
+    query = "&".join(f"{k}={v}" for k, v in (params or {}).items())
+    return f"{method} {path}" + (f"?{query}" if query else "")
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# -------------------- DRIVER --------------------
+async def _drive(client, method, path, params, body, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, path, params=params, json=body() if callable(body) else body)
+            await response.aread()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from db_utils import get_connection
+    from db_utils.indexes import ensure_indexes
+    from db_utils.rollups import rebuild_rollups
+    from benchmarks.seed import SCALES, seed
+
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        from benchmarks.mongomock_compat import patch_mongomock
+        patch_mongomock()
+        get_connection.client = AsyncMongoMockClient()
+
+    import main
+    from app.utils.auth_utils import issue_token
+    from app.utils.password_utils import pwd_context, shutdown_hashing
+
+    db = get_connection.connect()[get_connection.DB_NAME]
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    await ensure_indexes()
+
+    rows = SCALES.get(args.scale) or int(args.scale)
+    print(f"seeding {rows} rows across {args.users} users ({args.backend})...", file=sys.stderr)
+    seeded_at = time.perf_counter()
+    user_ids = await seed(db, rows, args.users, pwd_context.hash("bench-password"))
+    await rebuild_rollups()
+    print(f"seeded in {time.perf_counter() - seeded_at:.1f}s", file=sys.stderr)
+
+    headers = {"Authorization": f"Bearer {issue_token(user_ids[0])}"}
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for method, path, params, body_kind in SCENARIOS:
+                name = _scenario_name(method, path, params)
+                if args.only and args.only not in name:
+                    continue
+                if args.backend == "mongomock" and name in MONGOD_ONLY:
+                    print(f"  {name}: skipped (needs --backend mongod)", file=sys.stderr)
+                    continue
+                requests = LOGIN_REQUESTS if body_kind == "login" else args.requests
+                if body_kind in ("batch_update", "batch_delete"):
+                    requests = BATCH_REQUESTS
+                    body = await _batch_body(db, user_ids[0], body_kind, requests)
+                else:
+                    body = _body(body_kind, "bench0@example.com") if body_kind else None
+                # Warm up once so import/JIT-style first-call costs are excluded
+                await client.request(method, path, params=params, json=body() if callable(body) else body)
+                results[name] = await _drive(client, method, path, params, body, requests, args.concurrency)
+                print(f"  {name}: {results[name]}", file=sys.stderr)
+    finally:
+        shutdown_hashing()
+
+    return {
+        "commit": _git_commit(),
+        "backend": args.backend,
+        "scale": args.scale,
+        "rows": rows,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+
+
+# -------------------- REPORT --------------------
+def _print_report(report: dict, baseline: dict | None):
+    print(f"\ncommit {report['commit']}  backend={report['backend']}  rows={report['rows']}  "
+          f"users={report['users']}  concurrency={report['concurrency']}")
+    header = f"{'endpoint':<58} {'req':>5} {'err':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δrps':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for name, r in report["results"].items():
+        line = (f"{name:<58} {r['requests']:>5} {r['errors']:>4} {r['rps']:>9.1f} "
+                f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        base = (baseline or {}).get("results", {}).get(name)
+        if base:
+            d_p50 = (r["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100 if base["p50_ms"] else 0
+            d_rps = (r["rps"] - base["rps"]) / base["rps"] * 100 if base["rps"] else 0
+            line += f" {d_p50:>+7.1f}% {d_rps:>+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every FinTrack router against a synthetic ledger")
+    parser.add_argument("--scale", default="1k", help="1k, 100k, 1m or a row count")
+    parser.add_argument("--users", type=int, default=10, help="Users the rows are spread across")
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongomock")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017", help="Used with --backend mongod")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", help="Only run endpoints whose name contains this text")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --output run")
+    args = parser.parse_args()
+
+    # Must be set before the app modules read their configuration
+    os.environ["DB_NAME"] = BENCH_DB_NAME
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ.setdefault("AUTH_SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("PASSWORD_HASH_ROUNDS", "5000")
+    if not args.cache:
+        os.environ["CACHE_BACKEND"] = "none"
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.run import BENCH_DB_NAME, _percentile
+
+# Usage:
+#   python -m benchmarks.scaling --mongo-url mongodb://localhost:27017 --workers 1,2,4
+#   python -m benchmarks.scaling --mongo-url ... --scale 100k --output scaling.json
+#
+# Starts the production profile (python main.py) once per worker count on a
+# real socket and drives it from several load-generator processes, so the
+# numbers include HTTP parsing and the event loop, unlike benchmarks.run.
+# Needs a reachable mongod. Run the load generators on other cores than the
+# server (or another machine) or they cap the measured throughput.
+
+SERVER_STARTUP_TIMEOUT = 60
+
+DEFAULT_PATHS = ["/api/ping", "/api/users-transactions/?limit=100", "/api/founders-transactions/summary"]
+
+
+# -------------------- LOAD GENERATOR --------------------
+async def _load(base_url: str, paths: list, headers: dict, duration: float, connections: int) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        await asyncio.gather(*(worker(i) for i in range(connections)))
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def _client_process(base_url, paths, headers, duration, connections) -> dict:
+    return asyncio.run(_load(base_url, paths, headers, duration, connections))
+
+
+# -------------------- SERVER --------------------
+def _start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    server_env = {**os.environ, **env, "WEB_CONCURRENCY": str(workers), "PORT": str(port)}
+    return subprocess.Popen(
+        [sys.executable, "main.py"],
+        env=server_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        start_new_session=True
+    )
+
+
+def _wait_ready(server: subprocess.Popen, base_url: str, poll_interval: float = 0.25):
+    import httpx
+
+    deadline = time.time() + SERVER_STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited during startup:\n{server.stderr.read().decode()}")
+        try:
+            if httpx.get(base_url + "/api/ping", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(poll_interval)
+    raise RuntimeError("server did not become ready")
+
+
+def _stop_server(server: subprocess.Popen):
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+async def _seed(mongo_url: str, scale: str, users: int) -> str:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from bson import ObjectId
+    from benchmarks.seed import SCALES, seed
+    from app.utils.password_utils import pwd_context
+
+    client = AsyncIOMotorClient(mongo_url)
+    try:
+        db = client[BENCH_DB_NAME]
+        if scale:
+            for name in await db.list_collection_names():
+                await db.drop_collection(name)
+            rows = SCALES.get(scale) or int(scale)
+            print(f"seeding {rows} rows across {users} users...", file=sys.stderr)
+            user_ids = await seed(db, rows, users, pwd_context.hash("bench-password"))
+            return user_ids[0]
+        user = await db["users"].find_one({}, {"_id": 1})
+        return str(user["_id"]) if user else str(ObjectId())
+    finally:
+        client.close()
+
+
+# -------------------- DRIVER --------------------
+def run(args) -> dict:
+    secret = os.environ.get("AUTH_SECRET_KEY", "benchmark-secret")
+    env = {
+        "ENVIRONMENT": "production",
+        "MONGO_URL": args.mongo_url,
+        "DB_NAME": BENCH_DB_NAME,
+        "AUTH_SECRET_KEY": secret,
+        "CACHE_BACKEND": "memory" if args.cache else "none",
+    }
+    os.environ.update(AUTH_SECRET_KEY=secret)
+    os.environ.setdefault("PASSWORD_HASH_ROUNDS", "5000")
+
+    user_id = asyncio.run(_seed(args.mongo_url, args.scale, args.users))
+    if args.scale:
+        # Rollups back the summary endpoints
+        os.environ.update(MONGO_URL=args.mongo_url, DB_NAME=BENCH_DB_NAME)
+        from db_utils.rollups import rebuild_rollups
+        asyncio.run(rebuild_rollups())
+
+    from app.utils.auth_utils import issue_token
+    headers = {"Authorization": f"Bearer {issue_token(user_id)}"}
+    base_url = f"http://127.0.0.1:{args.port}"
+    paths = args.paths.split(",") if args.paths else DEFAULT_PATHS
+
+    results = {}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        server = _start_server(workers, args.port, env)
+        try:
+            _wait_ready(server, base_url)
+            # Warm every worker's pool and caches before measuring
+            _client_process(base_url, paths, headers, 2, args.connections)
+
+            with ProcessPoolExecutor(args.clients) as pool:
+                started = time.perf_counter()
+                futures = [
+                    pool.submit(_client_process, base_url, paths, headers, args.duration, args.connections)
+                    for _ in range(args.clients)
+                ]
+                parts = [f.result() for f in futures]
+                wall = time.perf_counter() - started
+        finally:
+            _stop_server(server)
+
+        latencies = sorted(l for part in parts for l in part["latencies"])
+        results[workers] = {
+            "requests": len(latencies),
+            "errors": sum(part["errors"] for part in parts),
+            "rps": round(len(latencies) / wall, 1),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        }
+        print(f"  {workers} worker(s): {results[workers]}", file=sys.stderr)
+
+    return {"paths": paths, "clients": args.clients, "connections": args.connections, "results": results}
+
+
+def _print_report(report: dict):
+    results = report["results"]
+    base = results[min(results)]["rps"] or 1
+    print(f"\npaths: {', '.join(report['paths'])}")
+    header = f"{'workers':>8} {'req':>8} {'err':>5} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for workers, r in sorted(results.items()):
+        print(f"{workers:>8} {r['requests']:>8} {r['errors']:>5} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rps'] / base:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput of the production profile per worker count")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--paths", help="Comma-separated GET paths (default: ping, a list and a summary)")
+    parser.add_argument("--scale", help="Seed a fresh ledger first: 1k, 100k, 1m or a row count")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per worker count")
+    parser.add_argument("--clients", type=int, default=2, help="Load generator processes")
+    parser.add_argument("--connections", type=int, default=32, help="Keep-alive connections per client")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
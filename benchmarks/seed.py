@@ -0,0 +1,98 @@
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+from db_utils.amounts import amount_fields
+
+# -------------------- SYNTHETIC LEDGERS --------------------
+# Deterministic for a given (rows, users, seed) so runs are comparable
+# across commits. Rows are split 70/15/15 between users_transactions,
+# users_business_profit and founders_transactions.
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+FOUNDERS = ["Utkarsh", "Umang"]
+PAYEES = FOUNDERS + ["Business", None]
+CATEGORIES = ["rent", "sales", "salary", "tools", "travel", "marketing", "tax"]
+
+BENCH_PASSWORD = "bench-password"
+INSERT_BATCH = 5_000
+
+
+def _dates(rng: random.Random, count: int) -> list:
+    start = datetime(2015, 1, 1)
+    span = (datetime(2026, 1, 1) - start).total_seconds()
+    return [start + timedelta(seconds=rng.random() * span) for _ in range(count)]
+
+
+def _transaction(rng, user_id, date, now):
+    txn_type = rng.choice(["income", "expense"])
+    return {
+        "user_id": ObjectId(user_id),
+        "type": txn_type,
+        **amount_fields(rng.randint(100, 500000)),
+        "date": date,
+        "category": rng.choice(CATEGORIES),
+        "details": "synthetic",
+        "payee": rng.choice(PAYEES) if txn_type == "expense" else None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _profit(rng, user_id, date, now):
+    return {
+        "user_id": ObjectId(user_id),
+        **amount_fields(rng.randint(100, 500000)),
+        "date": date,
+        "details": "synthetic",
+        "category": rng.choice(CATEGORIES),
+        "created_at": now,
+    }
+
+
+def _founder_transaction(rng, user_id, date, now):
+    txn = {
+        "user_id": ObjectId(user_id),
+        **amount_fields(rng.randint(100, 500000)),
+        "date": date,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if rng.random() < 0.5:
+        paid_by = rng.choice(FOUNDERS)
+        txn.update(type="reimbursement", paid_by=paid_by,
+                   paid_to=[f for f in FOUNDERS if f != paid_by][0])
+    else:
+        txn.update(type="salary", payee=rng.choice(FOUNDERS))
+    return txn
+
+
+async def _insert(collection, docs):
+    for i in range(0, len(docs), INSERT_BATCH):
+        await collection.insert_many(docs[i:i + INSERT_BATCH], ordered=False)
+
+
+async def seed(db, rows: int, users: int, password_hash: str, seed_value: int = 42) -> list:
+    rng = random.Random(seed_value)
+    now = datetime(2026, 1, 1)
+    user_ids = [str(ObjectId.from_datetime(now + timedelta(seconds=i))) for i in range(users)]
+
+    await db["users"].insert_many([
+        {"_id": ObjectId(uid), "email": f"bench{i}@example.com", "password": password_hash, "created_at": now}
+        for i, uid in enumerate(user_ids)
+    ])
+    await db["users_finances"].insert_many([
+        {"user_id": ObjectId(uid), "user_monthly_expenditure": 1000} for uid in user_ids
+    ])
+
+    split = [
+        ("users_transactions", _transaction, int(rows * 0.70)),
+        ("users_business_profit", _profit, int(rows * 0.15)),
+        ("founders_transactions", _founder_transaction, rows - int(rows * 0.70) - int(rows * 0.15)),
+    ]
+    for collection_name, make, count in split:
+        dates = _dates(rng, count)
+        docs = [make(rng, user_ids[i % users], dates[i], now) for i in range(count)]
+        await _insert(db[collection_name], docs)
+
+    return user_ids
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.run import BENCH_DB_NAME
+from benchmarks.scaling import _start_server, _stop_server, _wait_ready
+
+# Usage:
+#   python -m benchmarks.startup                                  # import times only
+#   python -m benchmarks.startup --mongo-url mongodb://localhost:27017
+#   python -m benchmarks.startup --mongo-url ... --max-import-ms 1200 --max-ready-ms 3000
+#
+# Reports how long `import main` takes (per first-party module and per
+# third-party package, from python -X importtime) and, with --mongo-url, the
+# time from launching the production profile (python main.py, one worker) to
+# its first 200 from /api/ping. Each figure is the median of --runs fresh
+# processes. With a --max-* budget it exits 1 when the budget is exceeded, so
+# CI can track startup like any other regression.
+
+FIRST_PARTY = ("main", "app", "db_utils")
+
+
+# -------------------- IMPORT TIME --------------------
+def _parse_importtime(stderr: str) -> list:
+    # "import time: self [us] | cumulative | imported package" -> (name, cumulative us)
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(cumulative_us)))
+    return entries
+
+
+def _import_profile() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+
+    entries = _parse_importtime(result.stderr)
+    total = next(cumulative_us for name, cumulative_us in entries if name == "main")
+
+    # A package's outermost import has the largest cumulative time. Packages
+    # pulled in by another one count towards both.
+    modules, packages = {}, {}
+    for name, cumulative_us in entries:
+        root = name.split(".")[0]
+        if root in FIRST_PARTY:
+            modules[name] = cumulative_us / 1000
+        elif root not in sys.stdlib_module_names:
+            packages[root] = max(packages.get(root, 0.0), cumulative_us / 1000)
+    return {"total_ms": total / 1000, "modules": modules, "packages": packages}
+
+
+# -------------------- TIME TO FIRST RESPONSE --------------------
+def _time_to_first_response(mongo_url: str, port: int) -> float:
+    import httpx  # noqa: F401 - loaded before the clock starts
+
+    env = {
+        "ENVIRONMENT": "production",
+        "MONGO_URL": mongo_url,
+        "DB_NAME": BENCH_DB_NAME,
+        "AUTH_SECRET_KEY": os.environ.get("AUTH_SECRET_KEY", "benchmark-secret"),
+    }
+    started = time.perf_counter()
+    server = _start_server(1, port, env)
+    try:
+        _wait_ready(server, f"http://127.0.0.1:{port}", poll_interval=0.01)
+        return (time.perf_counter() - started) * 1000
+    finally:
+        _stop_server(server)
+
+
+# -------------------- DRIVER --------------------
+def _median_by_key(runs: list) -> dict:
+    keys = {key for run in runs for key in run}
+    return {key: round(statistics.median(run.get(key, 0.0) for run in runs), 1) for key in keys}
+
+
+def run(args) -> dict:
+    profiles = [_import_profile() for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(p["total_ms"] for p in profiles), 1),
+        "modules_ms": _median_by_key([p["modules"] for p in profiles]),
+        "packages_ms": _median_by_key([p["packages"] for p in profiles]),
+    }
+    if args.mongo_url:
+        ready = [_time_to_first_response(args.mongo_url, args.port) for _ in range(args.runs)]
+        report["first_response_ms"] = round(statistics.median(ready), 1)
+    return report
+
+
+def _print_report(report: dict, top: int):
+    print(f"import main: {report['import_ms']:.1f} ms (median of {report['runs']})")
+    if "first_response_ms" in report:
+        print(f"time to first response: {report['first_response_ms']:.1f} ms")
+
+    print("\nfirst-party modules (cumulative ms)")
+    for name, ms in sorted(report["modules_ms"].items(), key=lambda item: -item[1])[:top]:
+        print(f"  {ms:>8.1f}  {name}")
+
+    print("\nthird-party packages (cumulative ms)")
+    for name, ms in sorted(report["packages_ms"].items(), key=lambda item: -item[1])[:top]:
+        print(f"  {ms:>8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and time to first response")
+    parser.add_argument("--mongo-url", help="Also time the production profile to its first response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if import main exceeds this")
+    parser.add_argument("--max-ready-ms", type=float, help="Fail if the first response takes longer")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    _print_report(report, args.top)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    failures = []
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        failures.append(f"import main took {report['import_ms']} ms (budget {args.max_import_ms} ms)")
+    if args.max_ready_ms is not None and report.get("first_response_ms", 0) > args.max_ready_ms:
+        failures.append(f"first response took {report['first_response_ms']} ms (budget {args.max_ready_ms} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# -------------------- MINOR UNITS --------------------
+# Money is stored as an integer number of minor units (cents) in
+# `amount_minor`, so totals are exact and can be summed by Mongo. `amount`
+# (major units, a float) is still written next to it for clients that read
+# it. Rows from before may only have `amount`; scripts/migrate_amounts.py
+# adds `amount_minor`, and until then reads derive it from `amount`.
+
+MINOR_PER_MAJOR = 100
+AMOUNT_FIELDS = ("amount", "amount_minor")
+
+# Largest magnitude a float still holds exactly, so `amount` never rounds
+MAX_AMOUNT_MINOR = 2 ** 53
+
+
+def to_minor(amount) -> int:
+    # Through the float's shortest repr: 19.99 -> 1999, where 19.99 * 100 is 1998.9999999999998
+    try:
+        value = Decimal(repr(float(amount)))
+    except (ValueError, TypeError):
+        raise ValueError("amount must be a number")
+    if not value.is_finite():
+        raise ValueError("amount must be a finite number")
+    minor = value * MINOR_PER_MAJOR
+    if abs(minor) > MAX_AMOUNT_MINOR:
+        raise ValueError("amount is out of range")
+    return int(minor.quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def to_major(minor: int) -> float:
+    return minor / MINOR_PER_MAJOR
+
+
+def amount_fields(minor: int) -> dict:
+    # Both stored forms of one amount
+    return {"amount_minor": minor, "amount": to_major(minor)}
+
+
+def doc_amount_minor(doc: dict) -> int:
+    minor = doc.get("amount_minor")
+    if minor is None:
+        return to_minor(doc.get("amount") or 0)
+    return minor
+
+
+def amount_minor_expr() -> dict:
+    # Aggregation equivalent of doc_amount_minor(); $round is half-to-even too
+    return {"$ifNull": [
+        "$amount_minor",
+        {"$toLong": {"$round": [{"$multiply": [{"$toDecimal": {"$ifNull": ["$amount", 0]}}, MINOR_PER_MAJOR]}, 0]}}
+    ]}
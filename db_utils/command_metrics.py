@@ -0,0 +1,52 @@
+from contextvars import ContextVar
+from pymongo import monitoring
+
+# -------------------- PER-REQUEST DB STATS --------------------
+# The metrics middleware puts a DbStats in this context var for each request.
+# Motor copies the context into its executor threads, so command events
+# raised while serving the request land on that request's DbStats.
+
+
+class DbStats:
+    __slots__ = ("round_trips", "time_seconds", "documents")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.time_seconds = 0.0
+        self.documents = 0
+
+
+current_db_stats: ContextVar[DbStats | None] = ContextVar("current_db_stats", default=None)
+
+
+def _documents_in_reply(reply) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    if "value" in reply:
+        return 1 if reply["value"] is not None else 0
+    return 0
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        stats = current_db_stats.get()
+        if stats is None:
+            return
+        stats.round_trips += 1
+        stats.time_seconds += event.duration_micros / 1e6
+        stats.documents += _documents_in_reply(event.reply)
+
+    def failed(self, event):
+        stats = current_db_stats.get()
+        if stats is None:
+            return
+        stats.round_trips += 1
+        stats.time_seconds += event.duration_micros / 1e6
+
+
+command_metrics = CommandMetricsListener()
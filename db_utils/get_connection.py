@@ -1,28 +1,132 @@
 import os
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from db_utils.command_metrics import command_metrics
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+# The one place .env is loaded: every module that reads config at import
+# time imports this module first (main.py imports it before the routers)
 load_dotenv()
 
-ENVIRONMENT = os.getenv("ENVIRONMENT", "local")
 MONGO_URL = os.getenv("MONGO_URL")
 DB_NAME = os.getenv("DB_NAME", "fintrack")
 
+# -------------------------
+# POOL SETTINGS
+# -------------------------
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+
+# -------------------------
+# POOL STATS
+# -------------------------
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            "open_connections": 0,
+            "checked_out": 0,
+            "total_created": 0,
+            "total_closed": 0,
+            "total_checkouts": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        }
+
+    def _inc(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._inc(pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._inc(open_connections=1, total_created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._inc(open_connections=-1, total_closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._inc(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._inc(checked_out=1, total_checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._inc(checked_out=-1)
+
+
+pool_stats = PoolStatsListener()
+
 
 # -------------------------
-# LOCAL → SYNC (PyMongo)
+# CLIENT (ASYNC, MOTOR)
 # -------------------------
-if ENVIRONMENT == "local":
-    client = MongoClient(MONGO_URL)
-    db = client[DB_NAME]
+# Created in the app lifespan via connect(); get_collection() falls back to
+# connecting lazily so scripts can use it without a lifespan. Motor itself is
+# imported on first connect, keeping it off the import path of every module
+# that only needs get_collection.
+client = None
+
+
+def connect() -> "AsyncIOMotorClient":
+    global client
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(
+            MONGO_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[pool_stats, command_metrics]
+        )
+    return client
+
+
+def close():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
 
-    def get_collection(collection_name: str):
-        return db[collection_name]
+def get_collection(collection_name: str):
+    return connect()[DB_NAME][collection_name]
 
-else:
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
 
-    def get_collection(collection_name: str):
-        return db[collection_name]
+def get_pool_stats() -> dict:
+    with pool_stats._lock:
+        stats = dict(pool_stats.stats)
+    return {
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "server_selection_timeout_ms": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connected": client is not None,
+        **stats
+    }
@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from db_utils.get_connection import get_collection
+from db_utils.tombstones import TOMBSTONES_COLLECTION, TOMBSTONE_TTL_DAYS
+from db_utils.user_ids import owner_filter
+
+# -------------------- INDEX REGISTRY --------------------
+# Every index the app relies on is declared here and created at startup.
+
+USER_DATE_INDEX = IndexModel(
+    [("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+    name="user_id_date"
+)
+
+# Delta sync walks (updated_at, _id) upwards from a client's watermark
+USER_UPDATED_INDEX = IndexModel(
+    [("user_id", ASCENDING), ("updated_at", ASCENDING), ("_id", ASCENDING)],
+    name="user_id_updated_at"
+)
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "users_transactions": [
+        USER_DATE_INDEX,
+        IndexModel(
+            [("user_id", ASCENDING), ("type", ASCENDING), ("payee", ASCENDING)],
+            name="user_id_type_payee"
+        ),
+        USER_UPDATED_INDEX,
+    ],
+    "users_business_profit": [
+        USER_DATE_INDEX,
+        USER_UPDATED_INDEX,
+    ],
+    "founders_transactions": [
+        USER_DATE_INDEX,
+        USER_UPDATED_INDEX,
+    ],
+    "users_finances": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "users_rollups": [
+        IndexModel([("user_id", ASCENDING), ("period", ASCENDING)], unique=True, name="user_id_period"),
+    ],
+    TOMBSTONES_COLLECTION: [
+        IndexModel(
+            [("user_id", ASCENDING), ("deleted_at", ASCENDING), ("_id", ASCENDING)],
+            name="user_id_deleted_at"
+        ),
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            expireAfterSeconds=TOMBSTONE_TTL_DAYS * 86400,
+            name="deleted_at_ttl"
+        ),
+    ],
+}
+
+
+# createIndexes refuses to change the options of an existing index
+INDEX_OPTIONS_CONFLICT = 85
+
+
+async def _create_indexes(collection_name: str, models: list):
+    collection = get_collection(collection_name)
+    try:
+        await collection.create_indexes(models)
+        return
+    except OperationFailure as e:
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+
+    # A changed TTL (e.g. TOMBSTONE_TTL_DAYS) is applied in place with collMod
+    existing = await collection.index_information()
+    for model in models:
+        spec = model.document
+        if "expireAfterSeconds" not in spec or spec["name"] not in existing:
+            continue
+        if existing[spec["name"]].get("expireAfterSeconds") != spec["expireAfterSeconds"]:
+            await collection.database.command(
+                "collMod", collection_name,
+                index={"name": spec["name"], "expireAfterSeconds": spec["expireAfterSeconds"]}
+            )
+    await collection.create_indexes(models)
+
+
+async def ensure_indexes():
+    # Concurrently: startup waits for one round of createIndexes, not one per collection
+    await asyncio.gather(*(
+        _create_indexes(collection_name, models)
+        for collection_name, models in INDEXES.items()
+    ))
+
+
+# -------------------- QUERY PLAN CHECKS --------------------
+# Representative shapes of the hot queries: (collection, filter, sort)
+
+SAMPLE_ID = "000000000000000000000000"
+SAMPLE_SINCE = datetime(2000, 1, 1)
+SYNC_SORT = [("updated_at", ASCENDING), ("_id", ASCENDING)]
+
+HOT_QUERIES = [
+    ("users", {"email": "probe@example.com"}, None),
+    ("users_transactions", owner_filter(SAMPLE_ID), [("date", DESCENDING), ("_id", DESCENDING)]),
+    ("users_transactions", {**owner_filter(SAMPLE_ID), "type": "expense", "payee": {"$in": ["Utkarsh", "Umang"]}}, None),
+    ("users_business_profit", owner_filter(SAMPLE_ID), [("date", DESCENDING)]),
+    ("founders_transactions", owner_filter(SAMPLE_ID), [("date", DESCENDING)]),
+    ("users_finances", owner_filter(SAMPLE_ID), None),
+    ("users_rollups", {**owner_filter(SAMPLE_ID), "period": "all"}, None),
+    ("users_transactions", {**owner_filter(SAMPLE_ID), "updated_at": {"$gt": SAMPLE_SINCE}}, SYNC_SORT),
+    ("users_business_profit", {**owner_filter(SAMPLE_ID), "updated_at": {"$gt": SAMPLE_SINCE}}, SYNC_SORT),
+    ("founders_transactions", {**owner_filter(SAMPLE_ID), "updated_at": {"$gt": SAMPLE_SINCE}}, SYNC_SORT),
+    (TOMBSTONES_COLLECTION, {**owner_filter(SAMPLE_ID), "deleted_at": {"$gt": SAMPLE_SINCE}},
+     [("deleted_at", ASCENDING), ("_id", ASCENDING)]),
+]
+
+
+def _plan_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def verify_query_plans():
+    failures = []
+
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = get_collection(collection_name).find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+
+        if "COLLSCAN" in stages:
+            failures.append(f"{collection_name} {query}: collection scan")
+        elif sort and "SORT" in stages:
+            failures.append(f"{collection_name} {query}: in-memory sort")
+
+    if failures:
+        raise RuntimeError("Hot queries are not index-backed:\n  " + "\n  ".join(failures))
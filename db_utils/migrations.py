@@ -0,0 +1,83 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable
+from pymongo.errors import BulkWriteError
+from db_utils.get_connection import get_collection
+
+PROGRESS_COLLECTION = "migrations"
+
+# -------------------- CHUNKED DATA MIGRATIONS --------------------
+# Walks the rows matching `pending` in _id order, batch_size at a time, and
+# bulk-writes the ops convert() returns (None skips a row). The last _id
+# done is checkpointed in PROGRESS_COLLECTION under "<name>:<collection>"
+# after every chunk, so an interrupted run resumes where it stopped and a
+# later run also picks up rows inserted since (new _ids sort last).
+# convert() should make its update conditional on the value it read, so a
+# concurrent write by the app is never overwritten.
+
+
+async def migrate_in_chunks(
+    name: str,
+    collection_name: str,
+    pending: dict,
+    fields: dict,
+    convert: Callable,
+    batch_size: int = 1000,
+    pause: float = 0,
+    restart: bool = False
+) -> dict:
+    collection = get_collection(collection_name)
+    progress = get_collection(PROGRESS_COLLECTION)
+    checkpoint_id = f"{name}:{collection_name}"
+
+    if restart:
+        await progress.delete_one({"_id": checkpoint_id})
+    checkpoint = await progress.find_one({"_id": checkpoint_id}) or {}
+    last_id = checkpoint.get("last_id")
+    counts = {key: checkpoint.get(key, 0) for key in ("converted", "skipped", "failed")}
+
+    def remaining() -> dict:
+        return {**pending, "_id": {"$gt": last_id}} if last_id else dict(pending)
+
+    total = await collection.count_documents(remaining())
+    if last_id:
+        print(f"{collection_name}: resuming after {last_id}, {total} row(s) to go")
+    else:
+        print(f"{collection_name}: {total} row(s) to go")
+
+    done = 0
+    started = time.monotonic()
+    while True:
+        batch = await collection.find(remaining(), fields).sort("_id", 1).limit(batch_size).to_list(None)
+        if not batch:
+            break
+
+        ops = [op for op in map(convert, batch) if op is not None]
+        counts["skipped"] += len(batch) - len(ops)
+        if ops:
+            try:
+                result = await collection.bulk_write(ops, ordered=False)
+                counts["converted"] += result.modified_count
+            except BulkWriteError as e:
+                counts["converted"] += e.details.get("nModified", 0)
+                counts["failed"] += len(e.details.get("writeErrors", []))
+
+        last_id = batch[-1]["_id"]
+        await progress.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, **counts, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+        done += len(batch)
+        elapsed = time.monotonic() - started
+        print(
+            f"{collection_name}: {done}/{total} ({done / max(total, 1):.0%}) "
+            f"converted={counts['converted']} skipped={counts['skipped']} failed={counts['failed']} "
+            f"{done / max(elapsed, 1e-9):.0f} rows/s"
+        )
+        if pause:
+            await asyncio.sleep(pause)
+
+    return counts
@@ -0,0 +1,269 @@
+from collections import defaultdict
+from datetime import datetime
+from pymongo import DeleteMany, UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from db_utils.get_connection import get_collection
+from db_utils.amounts import doc_amount_minor, to_minor
+from db_utils.user_ids import canonical_user_id, owner_filter, owner_on_insert
+
+ROLLUPS_COLLECTION = "users_rollups"
+ALL_TIME = "all"
+
+# Collections whose rows feed the rollups
+ROLLUP_SOURCES = ["users_transactions", "users_business_profit", "founders_transactions"]
+
+# Money totals are integer minor units (see db_utils.amounts), marked with
+# units=MINOR_UNITS. Rollups written before that hold float major units; they
+# are read as minor units and rebuilt the first time the owner's rollups are
+# used (see _ensure_rollups).
+MINOR_UNITS = "minor"
+COUNT_FIELDS = ("txn_count", "profit_count", "founder_txn_count")
+
+# Users whose rollups were checked to exist and be in minor units. Once true
+# it stays true (rows only ever add to an existing ALL_TIME doc, and nothing
+# writes major units any more); the set is only bounded for memory.
+CHECKED_USERS_CACHED = 100_000
+_checked_users = set()
+
+
+# -------------------- DELTAS --------------------
+def category_key(category: str) -> str:
+    # Categories are free text; '.' and a leading '$' can't appear in a field path
+    return category.replace(".", "_").lstrip("$") or "_"
+
+
+def month_key(date_val) -> str | None:
+    if isinstance(date_val, datetime):
+        return date_val.strftime("%Y-%m")
+    if isinstance(date_val, str) and len(date_val) >= 7:
+        return date_val[:7]
+    return None
+
+
+def rollup_deltas(collection_name: str, doc: dict) -> dict:
+    amount = doc_amount_minor(doc)
+
+    if collection_name == "users_transactions":
+        deltas = {"txn_count": 1}
+        if doc.get("type") == "income":
+            deltas["txn_income"] = amount
+        elif doc.get("type") == "expense":
+            deltas["txn_expense"] = amount
+            if doc.get("payee"):
+                deltas[f"invested.{doc['payee']}"] = amount
+            if doc.get("category"):
+                deltas[f"expense_by_category.{category_key(doc['category'])}"] = amount
+        return deltas
+
+    if collection_name == "users_business_profit":
+        return {"profit_count": 1, "profit_total": amount}
+
+    if collection_name == "founders_transactions":
+        deltas = {"founder_txn_count": 1}
+        if doc.get("type") == "reimbursement":
+            if doc.get("paid_to"):
+                deltas[f"reimbursements_received.{doc['paid_to']}"] = amount
+            if doc.get("paid_by"):
+                deltas[f"reimbursements_made.{doc['paid_by']}"] = amount
+        elif doc.get("type") == "salary" and doc.get("payee"):
+            deltas[f"salary_taken.{doc['payee']}"] = amount
+        return deltas
+
+    raise ValueError(f"No rollup defined for collection '{collection_name}'")
+
+
+def _accumulate(target: dict, collection_name: str, doc: dict, sign: int):
+    deltas = rollup_deltas(collection_name, doc)
+    periods = [ALL_TIME]
+    month = month_key(doc.get("date"))
+    if month:
+        periods.append(month)
+
+    for period in periods:
+        for field, value in deltas.items():
+            target[period][field] += sign * value
+
+
+# -------------------- WRITE PATH --------------------
+async def apply_rollups(
+    user_id,
+    collection_name: str,
+    added: list | None = None,
+    removed: list | None = None
+):
+    incs = defaultdict(lambda: defaultdict(int))
+    for doc in added or []:
+        _accumulate(incs, collection_name, doc, 1)
+    for doc in removed or []:
+        _accumulate(incs, collection_name, doc, -1)
+
+    if not any(any(fields.values()) for fields in incs.values()):
+        return
+    if await _ensure_rollups(user_id):
+        # Rebuilt from rows, which include this write
+        return
+
+    on_insert = {**owner_on_insert(user_id), "units": MINOR_UNITS}
+    ops = [
+        UpdateOne(
+            {**owner_filter(user_id), "period": period},
+            {"$inc": dict(fields), "$setOnInsert": on_insert},
+            upsert=True
+        )
+        for period, fields in incs.items()
+        if any(fields.values())
+    ]
+    rollups = get_collection(ROLLUPS_COLLECTION)
+    try:
+        await rollups.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # Two first writes to a period both tried to insert it; the losers
+        # now find it and $inc it like any other update
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        await rollups.bulk_write([ops[err["index"]] for err in errors], ordered=False)
+
+
+async def _ensure_rollups(user_id) -> bool:
+    # Rebuilds the user's rollups from rows, once, when they were never built
+    # (no ALL_TIME doc: rows from before rollups) or still hold major units,
+    # which $inc'ing minor units into would corrupt. True if it rebuilt.
+    key = str(canonical_user_id(user_id))
+    if key in _checked_users:
+        return False
+    rollups = get_collection(ROLLUPS_COLLECTION)
+    all_time = await rollups.find_one({**owner_filter(user_id), "period": ALL_TIME}, {"_id": 1})
+    legacy = all_time and await rollups.find_one(
+        {**owner_filter(user_id), "units": {"$ne": MINOR_UNITS}}, {"_id": 1}
+    )
+    rebuilt = not all_time or bool(legacy)
+    if rebuilt:
+        await rebuild_rollups(user_id)
+    if len(_checked_users) >= CHECKED_USERS_CACHED:
+        _checked_users.clear()
+    _checked_users.add(key)
+    return rebuilt
+
+
+# -------------------- READ PATH --------------------
+def _totals_to_minor(value):
+    if isinstance(value, dict):
+        return {key: _totals_to_minor(v) for key, v in value.items()}
+    if isinstance(value, (int, float)):
+        return to_minor(value)
+    return value
+
+
+def in_minor_units(rollup: dict | None) -> dict | None:
+    if not rollup or rollup.get("units") == MINOR_UNITS:
+        return rollup
+    return {key: value if key in COUNT_FIELDS else _totals_to_minor(value) for key, value in rollup.items()}
+
+
+async def get_rollup(user_id, period: str = ALL_TIME) -> dict:
+    await _ensure_rollups(user_id)
+    rollup = await get_collection(ROLLUPS_COLLECTION).find_one(
+        {**owner_filter(user_id), "period": period}
+    )
+    return in_minor_units(rollup) or {}
+
+
+async def get_monthly_rollups(user_id, first: str | None = None, last: str | None = None) -> list:
+    # Month periods sort as strings and all sort before ALL_TIME
+    period_range = {"$gte": first or "0000-00", "$lte": last or "9999-99"}
+    await _ensure_rollups(user_id)
+    cursor = get_collection(ROLLUPS_COLLECTION).find(
+        {**owner_filter(user_id), "period": period_range}
+    ).sort("period", 1)
+    return [in_minor_units(rollup) async for rollup in cursor]
+
+
+# -------------------- REBUILD --------------------
+def _flatten(doc: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in doc.items():
+        if key in ("_id", "user_id", "period") and not prefix:
+            continue
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _expand(flat: dict) -> dict:
+    doc = {}
+    for key, value in flat.items():
+        parts = key.split(".")
+        node = doc
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return doc
+
+
+async def rebuild_rollups(user_id: str | None = None, dry_run: bool = False) -> list:
+    # Recompute every rollup from raw rows and report where stored totals drifted
+    expected = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+    # Keyed by the canonical user_id, whichever form the rows still hold
+    for collection_name in ROLLUP_SOURCES:
+        query = owner_filter(user_id) if user_id else {}
+        cursor = get_collection(collection_name).find(
+            query, {"user_id": 1, "type": 1, "amount": 1, "amount_minor": 1, "date": 1, "category": 1,
+                    "payee": 1, "paid_by": 1, "paid_to": 1}
+        ).batch_size(1000)
+        async for doc in cursor:
+            _accumulate(expected[canonical_user_id(doc["user_id"])], collection_name, doc, 1)
+
+    rollups = get_collection(ROLLUPS_COLLECTION)
+    stored_query = owner_filter(user_id) if user_id else {}
+    stored = defaultdict(lambda: defaultdict(int))
+    # Periods that also (or only) have a doc keyed by the string user_id
+    string_keyed = set()
+    async for doc in rollups.find(stored_query):
+        key = (canonical_user_id(doc["user_id"]), doc["period"])
+        if doc["user_id"] != key[0]:
+            string_keyed.add(key)
+        for field, value in _flatten(in_minor_units(doc)).items():
+            stored[key][field] += value
+
+    wanted = {
+        (u, p): {k: v for k, v in fields.items() if v}
+        for u, periods in expected.items()
+        for p, fields in periods.items()
+    }
+
+    drift = []
+    keys = sorted(set(stored) | set(wanted), key=lambda key: (str(key[0]), key[1]))
+    for key in keys:
+        want = wanted.get(key, {})
+        have = {k: v for k, v in stored.get(key, {}).items() if v}
+        fields = {
+            f: {"stored": have.get(f, 0), "expected": want.get(f, 0)}
+            for f in set(want) | set(have)
+            if have.get(f, 0) != want.get(f, 0)
+        }
+        if fields:
+            drift.append({"user_id": str(key[0]), "period": key[1], "fields": fields})
+
+    if not dry_run:
+        ops = []
+        for key in keys:
+            # One doc per (user, period), keyed by the canonical user_id
+            if key in string_keyed:
+                ops.append(DeleteMany({"user_id": str(key[0]), "period": key[1]}))
+            ops.append(ReplaceOne(
+                {"user_id": key[0], "period": key[1]},
+                {"user_id": key[0], "period": key[1], "units": MINOR_UNITS, **_expand(wanted.get(key, {}))},
+                upsert=True
+            ))
+            if len(ops) >= 1000:
+                await rollups.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            await rollups.bulk_write(ops, ordered=False)
+
+    return drift
+
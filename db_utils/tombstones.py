@@ -0,0 +1,38 @@
+import os
+from datetime import datetime
+from db_utils.get_connection import get_collection
+from db_utils.user_ids import canonical_user_id, owner_filter
+
+TOMBSTONES_COLLECTION = "deleted_records"
+
+# Tombstones expire after this long (TTL index); a client whose last sync is
+# older than that has to do a full sync
+TOMBSTONE_TTL_DAYS = int(os.getenv("TOMBSTONE_TTL_DAYS", "90"))
+
+
+# -------------------- WRITE PATH --------------------
+async def record_deletions(user_id, collection_name: str, docs: list, skip_recorded: bool = False):
+    tombstones = get_collection(TOMBSTONES_COLLECTION)
+    if skip_recorded and docs:
+        # A concurrent delete of the same rows may already have left one
+        recorded = {
+            tombstone["record_id"]
+            async for tombstone in tombstones.find(
+                {**owner_filter(user_id), "collection": collection_name,
+                 "record_id": {"$in": [doc["_id"] for doc in docs]}},
+                {"record_id": 1}
+            )
+        }
+        docs = [doc for doc in docs if doc["_id"] not in recorded]
+    if not docs:
+        return
+    now = datetime.utcnow()
+    await tombstones.insert_many([
+        {
+            "user_id": canonical_user_id(user_id),
+            "collection": collection_name,
+            "record_id": doc["_id"],
+            "deleted_at": now
+        }
+        for doc in docs
+    ], ordered=False)
@@ -0,0 +1,36 @@
+import os
+from bson import ObjectId
+
+# -------------------- CANONICAL FORM --------------------
+# user_id is stored as an ObjectId (the users._id it refers to) in every
+# collection. Rows written before that may still hold the 24-char string;
+# scripts/migrate_user_ids.py rewrites them. Until it has finished, reads
+# match both forms. Set USER_ID_DUAL_READ=false afterwards so owner filters
+# become a single equality again.
+USER_ID_DUAL_READ = os.getenv("USER_ID_DUAL_READ", "true").lower() == "true"
+
+
+def canonical_user_id(user_id):
+    # Ids that aren't ObjectIds (legacy user-id header values) stay strings
+    if isinstance(user_id, ObjectId):
+        return user_id
+    return ObjectId(user_id) if ObjectId.is_valid(user_id) else str(user_id)
+
+
+def user_id_filter(user_id):
+    # Value for {"user_id": ...} in any owner-scoped query
+    canonical = canonical_user_id(user_id)
+    if USER_ID_DUAL_READ and isinstance(canonical, ObjectId):
+        return {"$in": [canonical, str(canonical)]}
+    return canonical
+
+
+def owner_filter(user_id) -> dict:
+    return {"user_id": user_id_filter(user_id)}
+
+
+def owner_on_insert(user_id) -> dict:
+    # $setOnInsert fields: upserts filtering on both forms can't take user_id from the filter
+    if isinstance(user_id_filter(user_id), dict):
+        return {"user_id": canonical_user_id(user_id)}
+    return {}
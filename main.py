@@ -1,7 +1,10 @@
 import os
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+# First: loads .env before any module below reads its config
+from db_utils import get_connection
 from app.endpoints import sample_endpoint
 from app.endpoints import auth_endpoint
 from app.endpoints import users_endpoint
@@ -9,15 +12,38 @@ from app.endpoints import users_finances_endpoint
 from app.endpoints import users_transactions_endpoint
 from app.endpoints import users_business_profit_endpoint
 from app.endpoints import founders_transactions_endpoint
+from app.endpoints import users_export_endpoint
+from app.endpoints import system_endpoint
+from app.endpoints import events_endpoint
+from app.endpoints import sync_endpoint
+from db_utils.indexes import ensure_indexes, verify_query_plans
+from app.utils.password_utils import shutdown_hashing
+from app.utils.metrics_utils import MetricsMiddleware, render_metrics
+from app.utils.events_utils import close_change_feed, enable_change_feed
 
-load_dotenv()
+VERIFY_QUERY_PLANS = os.getenv("VERIFY_QUERY_PLANS", "false").lower() == "true"
+
+
+# -------------------- LIFESPAN --------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_connection.connect()
+    await ensure_indexes()
+    if VERIFY_QUERY_PLANS:
+        await verify_query_plans()
+    await enable_change_feed()
+    yield
+    await close_change_feed()
+    shutdown_hashing()
+    get_connection.close()
 
 
 app = FastAPI(
     title="FinTrack API",
     description="Backend API for the FinTrack application",
     version="1.0.0",
-    redirect_slashes=False
+    redirect_slashes=False,
+    lifespan=lifespan
 )
 
 # -------------------- CORS --------------------
@@ -29,11 +55,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -------------------- METRICS --------------------
+app.add_middleware(MetricsMiddleware)
+
 # -------------------- ROOT --------------------
 @app.get("/")
 def root():
     return {"message": "🚀 FinTrack API is running successfully!"}
 
+# async: renders on the event loop, never in a thread racing request updates
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # -------------------- ROUTERS --------------------
 app.include_router(sample_endpoint.router, prefix="/api", tags=["Sample"])
 app.include_router(auth_endpoint.router, prefix="/api/auth", tags=["Auth"])
@@ -61,7 +95,44 @@ app.include_router(
     tags=["Founders Transactions"]
 )
 
+app.include_router(
+    users_export_endpoint.router,
+    prefix="/api/export",
+    tags=["Export"]
+)
+
+app.include_router(
+    sync_endpoint.router,
+    prefix="/api/sync",
+    tags=["Sync"]
+)
+
+app.include_router(
+    events_endpoint.router,
+    prefix="/api/events",
+    tags=["Events"]
+)
+
+app.include_router(
+    system_endpoint.router,
+    prefix="/api/system",
+    tags=["System"]
+)
+
 # -------------------- ENTRY POINT --------------------
+# ENVIRONMENT=local: one auto-reloading process.
+# Anything else: production profile. Each worker is a separate process with
+# its own event loop and its own Mongo client (created in the lifespan, never
+# inherited). The app is imported here in the parent first, so a broken
+# config or import fails once, before any worker is spawned.
+def _default_workers() -> int:
+    # CPUs this process may run on (respects taskset/cpusets)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -70,12 +141,27 @@ if __name__ == "__main__":
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8000"))
 
-    # Enable reload only in local environment
-    reload = ENVIRONMENT == "local"
-
-    uvicorn.run(
-        "main:app",
-        host=HOST,
-        port=PORT,
-        reload=reload
-    )
+    if ENVIRONMENT == "local":
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            reload=True
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            # Unset or empty (as in .env.example) means one per CPU
+            workers=int(os.getenv("WEB_CONCURRENCY") or _default_workers()),
+            # uvloop / httptools when installed, asyncio / h11 otherwise
+            loop="auto",
+            http="auto",
+            backlog=int(os.getenv("BACKLOG", "2048")),
+            timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "5")),
+            timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30")),
+            proxy_headers=True,
+            forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+            access_log=os.getenv("ACCESS_LOG", "false").lower() == "true"
+        )
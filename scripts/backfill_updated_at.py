@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+from db_utils.get_connection import get_collection
+
+# Usage: python -m scripts.backfill_updated_at [--dry-run]
+#
+# Delta sync only sees rows with an updated_at. Older rows (profits never had
+# one) get their created_at, or now when that is missing too.
+
+SYNCED_COLLECTIONS = ["users_transactions", "users_business_profit", "founders_transactions"]
+
+
+async def main(dry_run: bool):
+    missing = {"updated_at": {"$exists": False}}
+
+    for collection_name in SYNCED_COLLECTIONS:
+        collection = get_collection(collection_name)
+        if dry_run:
+            count = await collection.count_documents(missing)
+            print(f"{collection_name}: {count} row(s) without updated_at")
+            continue
+
+        result = await collection.update_many(
+            missing,
+            [{"$set": {"updated_at": {"$ifNull": ["$created_at", "$$NOW"]}}}]
+        )
+        print(f"{collection_name}: backfilled {result.modified_count} row(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stamp updated_at on rows that predate delta sync")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows that need it")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.dry_run))
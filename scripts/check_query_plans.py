@@ -0,0 +1,15 @@
+import asyncio
+from db_utils.indexes import ensure_indexes, verify_query_plans
+
+# Usage: python -m scripts.check_query_plans
+# Exits non-zero if any hot query falls back to a collection scan or in-memory sort.
+
+
+async def main():
+    await ensure_indexes()
+    await verify_query_plans()
+    print("All hot queries are index-backed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+from datetime import datetime
+from pymongo import UpdateOne
+from db_utils.amounts import amount_fields, to_minor
+from db_utils.get_connection import get_collection
+from db_utils.migrations import migrate_in_chunks
+from db_utils.rollups import MINOR_UNITS, ROLLUP_SOURCES, ROLLUPS_COLLECTION, rebuild_rollups
+
+# Usage: python -m scripts.migrate_amounts [--dry-run] [--batch-size N] [--pause-ms MS]
+#                                          [--collection NAME] [--restart] [--rebuild-rollups]
+#
+# Adds amount_minor (integer cents) to ledger rows that only have the float
+# amount, in resumable chunks (see db_utils.migrations). amount is rewritten
+# to the rounded value so both fields agree, and updated_at is bumped so
+# delta sync sends the rows again. Rows whose amount isn't a finite number
+# are left alone and reported.
+#
+# Rollups from before minor units are converted on their owner's next write;
+# --rebuild-rollups recomputes them all at the end instead.
+
+MIGRATION_NAME = "amount_minor"
+
+MISSING_MINOR = {"amount_minor": {"$exists": False}}
+
+
+def _convert(doc: dict):
+    amount = doc.get("amount")
+    if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+        return None
+    try:
+        minor = to_minor(amount)
+    except ValueError:
+        return None
+    # updated_at too, so delta-sync clients already past this row receive amount_minor
+    return UpdateOne(
+        {"_id": doc["_id"], "amount": amount, **MISSING_MINOR},
+        {"$set": {**amount_fields(minor), "updated_at": datetime.utcnow()}}
+    )
+
+
+async def main(args) -> int:
+    collections = [args.collection] if args.collection else ROLLUP_SOURCES
+    legacy_rollups = {"units": {"$ne": MINOR_UNITS}}
+
+    if args.dry_run:
+        for collection_name in collections:
+            count = await get_collection(collection_name).count_documents(MISSING_MINOR)
+            print(f"{collection_name}: {count} row(s) without amount_minor")
+        count = await get_collection(ROLLUPS_COLLECTION).count_documents(legacy_rollups)
+        print(f"{ROLLUPS_COLLECTION}: {count} rollup(s) in major units")
+        return 0
+
+    failed = 0
+    for collection_name in collections:
+        counts = await migrate_in_chunks(
+            MIGRATION_NAME, collection_name, MISSING_MINOR, {"amount": 1}, _convert,
+            args.batch_size, args.pause_ms / 1000, args.restart
+        )
+        failed += counts["failed"]
+
+    left = {
+        name: count
+        for name in ROLLUP_SOURCES
+        if (count := await get_collection(name).count_documents(MISSING_MINOR))
+    }
+    if left:
+        print(f"rows without amount_minor (no numeric amount, or written since): {left}")
+
+    if args.rebuild_rollups:
+        drift = await rebuild_rollups()
+        print(f"rebuilt rollups, {len(drift)} document(s) changed")
+    else:
+        count = await get_collection(ROLLUPS_COLLECTION).count_documents(legacy_rollups)
+        if count:
+            print(f"{count} rollup(s) still in major units; run with --rebuild-rollups "
+                  f"or python -m scripts.rebuild_rollups to convert them now")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store ledger amounts as integer minor units")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows still to convert")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=int, default=0, help="Sleep between chunks to limit load")
+    parser.add_argument("--collection", choices=ROLLUP_SOURCES, help="Only migrate this collection")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved checkpoints and rescan")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="Recompute every rollup afterwards")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args)))
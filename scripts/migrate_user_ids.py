@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+from datetime import datetime
+from functools import partial
+from bson import ObjectId
+from pymongo import UpdateOne
+from db_utils.get_connection import get_collection
+from db_utils.migrations import migrate_in_chunks
+from db_utils.rollups import ROLLUP_SOURCES, ROLLUPS_COLLECTION
+from db_utils.tombstones import TOMBSTONES_COLLECTION
+
+# Usage: python -m scripts.migrate_user_ids [--dry-run] [--batch-size N] [--pause-ms MS]
+#                                           [--collection NAME] [--restart]
+#
+# Rewrites string user_ids to ObjectIds in resumable chunks (see
+# db_utils.migrations). Each update re-checks the stored string, so running
+# next to live traffic is safe. Ledger rows also get a new updated_at so
+# delta sync sends them again. Strings that aren't valid ObjectIds are left
+# alone and reported.
+#
+# The app reads both forms while USER_ID_DUAL_READ=true (the default). Once
+# this reports nothing left to convert, set it to false.
+
+MIGRATION_NAME = "user_id_objectid"
+
+MIGRATED_COLLECTIONS = [
+    "users_transactions",
+    "users_business_profit",
+    "founders_transactions",
+    "users_finances",
+    ROLLUPS_COLLECTION,
+    TOMBSTONES_COLLECTION,
+]
+
+STRING_USER_ID = {"user_id": {"$type": "string"}}
+
+
+def _convert(doc: dict, synced: bool = False):
+    if not ObjectId.is_valid(doc["user_id"]):
+        return None
+    update = {"user_id": ObjectId(doc["user_id"])}
+    if synced:
+        # Delta-sync clients already past this row receive it again
+        update["updated_at"] = datetime.utcnow()
+    return UpdateOne({"_id": doc["_id"], "user_id": doc["user_id"]}, {"$set": update})
+
+
+async def main(args) -> int:
+    collections = [args.collection] if args.collection else MIGRATED_COLLECTIONS
+
+    if args.dry_run:
+        for collection_name in collections:
+            count = await get_collection(collection_name).count_documents(STRING_USER_ID)
+            print(f"{collection_name}: {count} row(s) with a string user_id")
+        return 0
+
+    failed = 0
+    for collection_name in collections:
+        convert = partial(_convert, synced=collection_name in ROLLUP_SOURCES)
+        counts = await migrate_in_chunks(
+            MIGRATION_NAME, collection_name, STRING_USER_ID, {"user_id": 1}, convert,
+            args.batch_size, args.pause_ms / 1000, args.restart
+        )
+        failed += counts["failed"]
+
+    remaining = {
+        name: await get_collection(name).count_documents(STRING_USER_ID)
+        for name in MIGRATED_COLLECTIONS
+    }
+    left = {name: count for name, count in remaining.items() if count}
+    if left:
+        print(f"string user_ids left (not valid ObjectIds, or written since): {left}")
+    else:
+        print("all user_ids are ObjectIds; USER_ID_DUAL_READ can be set to false")
+    if failed:
+        # e.g. a rollup that already exists under the ObjectId form
+        print(f"{failed} row(s) failed to convert; for {ROLLUPS_COLLECTION}, run python -m scripts.rebuild_rollups")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store user_id as an ObjectId in every collection")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows still holding a string user_id")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=int, default=0, help="Sleep between chunks to limit load")
+    parser.add_argument("--collection", choices=MIGRATED_COLLECTIONS, help="Only migrate this collection")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved checkpoints and rescan")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args)))
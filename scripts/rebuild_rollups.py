@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+import json
+from db_utils.rollups import rebuild_rollups
+
+# Usage: python -m scripts.rebuild_rollups [--user-id ID] [--dry-run]
+
+
+async def main(user_id: str | None, dry_run: bool):
+    drift = await rebuild_rollups(user_id=user_id, dry_run=dry_run)
+
+    for entry in drift:
+        print(json.dumps(entry, default=str))
+
+    action = "found (dry run, nothing written)" if dry_run else "corrected"
+    print(f"{len(drift)} drifted rollup document(s) {action}")
+    return 1 if drift and dry_run else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute users_rollups from raw rows")
+    parser.add_argument("--user-id", help="Only rebuild rollups for this user")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args.user_id, args.dry_run)))
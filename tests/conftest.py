@@ -0,0 +1,35 @@
+import asyncio
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from benchmarks.mongomock_compat import patch_mongomock
+from db_utils import get_connection, rollups
+
+# Usage: pip install -r tests/requirements.txt && python -m pytest tests
+#
+# Runs the app against an in-memory mongomock database, so no mongod is needed.
+
+patch_mongomock()
+
+
+@pytest.fixture
+def db():
+    get_connection.client = AsyncMongoMockClient()
+    rollups._checked_users.clear()
+    return get_connection.client[get_connection.DB_NAME]
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
+
+
+@pytest.fixture
+def client():
+    import main
+
+    def make(headers: dict | None = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://test", headers=headers or {}
+        )
+    return make
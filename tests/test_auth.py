@@ -0,0 +1,14 @@
+import asyncio
+from db_utils.indexes import ensure_indexes
+
+
+def test_concurrent_signups_for_one_email(db, run, client):
+    async def scenario():
+        await ensure_indexes()
+        body = {"email": "same@example.com", "password": "correct horse"}
+        async with client() as c:
+            return await asyncio.gather(*(c.post("/api/auth/signup", json=body) for _ in range(2)))
+
+    responses = run(scenario())
+    assert sorted(response.status_code for response in responses) == [200, 400]
+    assert run(db.users.count_documents({})) == 1
@@ -0,0 +1,68 @@
+from datetime import datetime
+from bson import ObjectId
+from app.utils import batch_utils
+from app.utils.auth_utils import issue_token
+from db_utils.rollups import rebuild_rollups
+
+
+def _with_concurrent_request(monkeypatch, request):
+    # Runs `request` right after the batch has read its rows, before it writes
+    fetch_owned = batch_utils._fetch_owned
+    calls = []
+
+    async def fetch_then_race(*args):
+        rows = await fetch_owned(*args)
+        if not calls:
+            calls.append(await request())
+        return rows
+    monkeypatch.setattr(batch_utils, "_fetch_owned", fetch_then_race)
+    return calls
+
+
+def _seed(db, run, user_id, count=3):
+    now = datetime(2026, 1, 1)
+    rows = [
+        {"user_id": user_id, "amount_minor": 100, "amount": 1.0, "date": datetime(2026, 1, 5),
+         "created_at": now, "updated_at": now}
+        for _ in range(count)
+    ]
+    run(db.users_business_profit.insert_many(rows))
+    run(rebuild_rollups(user_id))
+    return [str(row["_id"]) for row in rows]
+
+
+def test_batch_delete_racing_a_single_delete(db, run, client, monkeypatch):
+    user_id = ObjectId()
+    ids = _seed(db, run, user_id)
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            _with_concurrent_request(monkeypatch, lambda: c.delete(f"/api/users-business-profit/{ids[0]}"))
+            batch = (await c.post("/api/users-business-profit/batch/delete", json={"ids": ids})).json()
+            totals = (await c.get("/api/users-business-profit/")).json()
+            return batch, totals
+
+    batch, totals = run(scenario())
+    assert [result["status"] for result in batch["results"]] == ["deleted"] * 3
+    assert totals["total_profit"] == 0
+    assert run(db.deleted_records.count_documents({})) == 3
+
+
+def test_batch_update_racing_a_put(db, run, client, monkeypatch):
+    user_id = ObjectId()
+    ids = _seed(db, run, user_id, count=2)
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            _with_concurrent_request(monkeypatch, lambda: c.put(
+                f"/api/users-business-profit/{ids[0]}", json={"amount_minor": 500, "date": "2026-01-05"}
+            ))
+            batch = (await c.patch("/api/users-business-profit/batch", json={"updates": [
+                {"id": row_id, "fields": {"amount_minor": 300}} for row_id in ids
+            ]})).json()
+            totals = (await c.get("/api/users-business-profit/")).json()
+            return batch, totals
+
+    batch, totals = run(scenario())
+    assert [result["status"] for result in batch["results"]] == ["conflict", "updated"]
+    assert totals["total_profit"] == 8.0
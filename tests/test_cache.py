@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+from app.utils import cache_utils
+from app.utils.cache_utils import InMemoryCacheBackend, cached_response, invalidate_user_cache
+
+
+def _request(path: str = "/api/things/"):
+    return SimpleNamespace(url=SimpleNamespace(path=path, query=""), headers={})
+
+
+def test_fill_racing_a_write_is_not_stored_and_generations_are_dropped(run, monkeypatch):
+    monkeypatch.setattr(cache_utils, "cache_backend", InMemoryCacheBackend())
+    release = asyncio.Event()
+    values = iter(["stale", "fresh"])
+
+    @cached_response()
+    async def endpoint(request, user_id):
+        value = next(values)
+        if value == "stale":
+            await release.wait()
+        return {"value": value}
+
+    async def scenario():
+        filling = asyncio.ensure_future(endpoint(request=_request(), user_id="u1"))
+        await asyncio.sleep(0)
+        await invalidate_user_cache("u1")
+        release.set()
+        await filling
+        # The stale fill wasn't cached, so this reads the new value
+        response = await endpoint(request=_request(), user_id="u1")
+        for user in range(100):
+            await invalidate_user_cache(f"other-{user}")
+        return response.body
+
+    assert run(scenario()) == b'{"value":"fresh"}'
+    assert cache_utils._generations == {}
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from datetime import datetime
+from bson import ObjectId
+from app.endpoints.users_transactions_endpoint import TRANSACTION_FIELDS
+from app.utils.serialization import dumps
+from app.utils.events_utils import RESET_FRAME, ChangeStreamFeed, MemoryChangeFeed, _event
+
+
+async def _next_frames(stream, count: int) -> list:
+    return [await asyncio.wait_for(anext(stream), 1) for _ in range(count)]
+
+
+def test_history_is_bounded_by_user(run):
+    feed = MemoryChangeFeed(replay_size=10, history_users=2)
+    for user in ("a", "b", "c"):
+        feed.publish(user, [_event("insert", "users_transactions", ObjectId())])
+
+    assert list(feed._history) == ["b", "c"]
+    # "a" was evicted with its only event: a reconnect from before it can't be replayed
+    assert feed._replay("a", f"{feed._epoch}-0") is None
+    assert len(feed._replay("c", f"{feed._epoch}-2")) == 1
+
+
+def test_change_stream_fans_out_by_owner(run):
+    feed = ChangeStreamFeed()
+    owner, other = ObjectId(), ObjectId()
+
+    async def scenario():
+        # Subscribed directly, without starting the shared change stream
+        stream = MemoryChangeFeed.stream(feed, str(owner))
+        receiving = asyncio.ensure_future(_next_frames(stream, 2))
+        await asyncio.sleep(0)
+        for user_id in (other, owner):
+            feed._dispatch({
+                "operationType": "insert", "ns": {"coll": "users_transactions"},
+                "documentKey": {"_id": ObjectId()}, "fullDocument": {"user_id": user_id, "amount_minor": 1},
+            })
+        feed._dispatch({
+            "operationType": "delete", "ns": {"coll": "users_transactions"},
+            "documentKey": {"_id": ObjectId()}, "fullDocumentBeforeChange": {"user_id": owner},
+        })
+        frames = await receiving
+        await stream.aclose()
+        return frames
+
+    frames = run(scenario())
+    assert [b"event: change" in frame for frame in frames] == [True, True]
+    assert b'"op":"insert"' in frames[0] and b'"op":"delete"' in frames[1]
+
+
+def test_lost_change_stream_resets_subscribers(run):
+    feed = ChangeStreamFeed()
+
+    async def scenario():
+        stream = MemoryChangeFeed.stream(feed, "u")
+        receiving = asyncio.ensure_future(_next_frames(stream, 1))
+        await asyncio.sleep(0)
+        feed.reset_all()
+        frames = await receiving
+        await stream.aclose()
+        return frames
+
+    assert run(scenario()) == [RESET_FRAME]
+
+
+def test_event_doc_has_the_sync_row_shape():
+    stored = {"_id": ObjectId(), "user_id": ObjectId(), "type": "expense", "amount": 1.5, "amount_minor": 150,
+              "date": datetime(2026, 1, 5, 13, 30), "internal": "not for clients"}
+    doc = json.loads(dumps(_event("insert", "users_transactions", stored["_id"], stored)))["doc"]
+
+    assert set(doc) == set(TRANSACTION_FIELDS)
+    assert doc["date"] == "2026-01-05"
+    assert doc["_id"] == str(stored["_id"])
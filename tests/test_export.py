@@ -0,0 +1,22 @@
+import csv
+import io
+from datetime import datetime
+from bson import ObjectId
+from app.utils.auth_utils import issue_token
+
+
+def test_export_includes_amount_minor_for_unmigrated_rows(db, run, client):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    run(db.users_business_profit.insert_many([
+        {"user_id": user_id, "amount": 19.99, "date": datetime(2026, 1, 5), "created_at": now, "updated_at": now},
+        {"user_id": user_id, "amount": 2.5, "amount_minor": 250, "date": datetime(2026, 1, 6),
+         "created_at": now, "updated_at": now},
+    ]))
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            return (await c.get("/api/export/", params={"format": "csv"})).text
+
+    rows = list(csv.DictReader(io.StringIO(run(scenario()))))
+    assert [(row["amount"], row["amount_minor"]) for row in rows] == [("19.99", "1999"), ("2.5", "250")]
@@ -0,0 +1,23 @@
+from bson import ObjectId
+from app.utils.auth_utils import issue_token
+
+
+def _auth(user_id) -> dict:
+    return {"Authorization": f"Bearer {issue_token(str(user_id))}"}
+
+
+def test_null_budgets_are_rejected_and_tolerated_on_read(db, run, client):
+    user_id = ObjectId()
+    # As a PUT before nulls were rejected could have left it
+    run(db.users_finances.insert_one({"user_id": user_id, "category_budgets": None, "monthly_budgets": None}))
+
+    async def scenario():
+        async with client(_auth(user_id)) as c:
+            put = await c.put("/api/users-finances/", json={"category_budgets": None})
+            get = await c.get("/api/users-finances/", params={"month": "2026-01"})
+            return put, get
+
+    put, get = run(scenario())
+    assert put.status_code == 422
+    assert get.status_code == 200
+    assert get.json()["budget"]["categories"] == {}
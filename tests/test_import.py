@@ -0,0 +1,38 @@
+from app.utils import import_utils
+from app.utils.import_utils import iter_csv_rows, iter_lines, iter_ndjson_rows
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _rows(parse, data: bytes) -> list:
+    return [row async for row in parse(iter_lines(_chunks(data)))]
+
+
+def test_stray_quote_costs_one_row(run):
+    data = b'date,amount\n2026-01-01,"1\n2026-01-02,2\n2026-01-03,3\n'
+    assert run(_rows(iter_csv_rows, data)) == [
+        (1, "unterminated quoted field"),
+        (2, {"date": "2026-01-02", "amount": "2"}),
+        (3, {"date": "2026-01-03", "amount": "3"}),
+    ]
+
+
+def test_quoted_newline_joins_lines(run):
+    data = b'date,details\n2026-01-01,"two\nlines"\n'
+    assert run(_rows(iter_csv_rows, data)) == [(1, {"date": "2026-01-01", "details": "two\nlines"})]
+
+
+def test_oversized_records_are_reported_and_skipped(run, monkeypatch):
+    monkeypatch.setattr(import_utils, "MAX_RECORD_LENGTH", 20)
+    data = b'date,amount\n2026-01-01,"1\n' + b"x,1\n" * 10 + b"2026-01-02,2\n"
+    rows = run(_rows(iter_csv_rows, data))
+    assert rows[0] == (1, "record longer than 20 characters")
+    assert rows[-1] == (len(rows), {"date": "2026-01-02", "amount": "2"})
+
+    data = b'{"amount": 1}\n{"details": "' + b"x" * 100 + b'"}\n{"amount": 2}\n'
+    assert run(_rows(iter_ndjson_rows, data)) == [
+        (1, {"amount": 1}), (2, "line longer than 20 characters"), (3, {"amount": 2})
+    ]
@@ -0,0 +1,95 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.utils import serialization
+from app.utils.auth_utils import issue_token
+from app.endpoints.users_transactions_endpoint import TransactionResponse
+
+# Pins the list endpoints' JSON after the switch to serialize_doc + orjson:
+# the same keys and values the old per-row mutation loop produced.
+
+CREATED = datetime(2026, 1, 2, 3, 4, 5, 678000)
+UPDATED = datetime(2026, 1, 3, 8, 0)
+
+
+def _auth(user_id) -> dict:
+    return {"Authorization": f"Bearer {issue_token(str(user_id))}"}
+
+
+def _legacy_row(doc: dict) -> dict:
+    # What get_user_transactions returned before serialize_doc: ids and date
+    # converted in place, then validated and dumped by the response model
+    row = {**doc, "_id": str(doc["_id"]), "user_id": str(doc["user_id"])}
+    if isinstance(row["date"], datetime):
+        row["date"] = row["date"].date().isoformat()
+    return TransactionResponse.model_validate(row).model_dump(mode="json", by_alias=True)
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "stdlib"])
+def test_transaction_list_matches_the_previous_response_shape(db, run, client, monkeypatch, encoder):
+    if encoder == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    user_id = ObjectId()
+    docs = [
+        {"_id": ObjectId(), "user_id": user_id, "type": "expense", "amount": 12.5, "amount_minor": 1250,
+         "date": datetime(2026, 2, 1), "category": "Food", "details": "lunch", "payee": "Cafe",
+         "created_at": CREATED, "updated_at": UPDATED, "synced": True},
+        # Legacy row: string date, no optional fields
+        {"_id": ObjectId(), "user_id": user_id, "type": "income", "amount": 100.0, "amount_minor": 10000,
+         "date": "2026-01-15", "category": "Salary", "created_at": CREATED, "updated_at": UPDATED},
+    ]
+    run(db.users_transactions.insert_many([dict(doc) for doc in docs]))
+
+    async def scenario():
+        async with client(_auth(user_id)) as c:
+            page = await c.get("/api/users-transactions/")
+            legacy = await c.get("/api/users-transactions/", params={"paginate": "false"})
+            return page.json(), legacy.json()
+
+    page, legacy = run(scenario())
+    expected = [_legacy_row(doc) for doc in docs]
+    assert page == {"items": expected, "next_cursor": None}
+    assert legacy == expected
+    first = page["items"][0]
+    assert list(first) == list(expected[0])
+    assert first["_id"] == str(docs[0]["_id"])
+    assert first["user_id"] == str(user_id)
+    assert first["date"] == "2026-02-01"
+    assert first["created_at"] == "2026-01-02T03:04:05.678000"
+    assert first["updated_at"] == "2026-01-03T08:00:00"
+
+
+def test_profit_and_founder_lists_keep_their_row_shape(db, run, client):
+    user_id = ObjectId()
+    profit_id, founder_id = ObjectId(), ObjectId()
+    run(db.users_business_profit.insert_one({
+        "_id": profit_id, "user_id": user_id, "amount": 40.0, "amount_minor": 4000,
+        "date": datetime(2026, 2, 10), "details": "consulting", "category": "Services",
+        "created_at": CREATED, "updated_at": UPDATED,
+    }))
+    run(db.founders_transactions.insert_one({
+        "_id": founder_id, "user_id": user_id, "type": "reimbursement", "amount": 7.25, "amount_minor": 725,
+        "date": datetime(2026, 2, 11), "paid_by": "Utkarsh", "paid_to": "Umang", "payee": "Shop",
+        "created_at": CREATED, "updated_at": UPDATED,
+    }))
+
+    async def scenario():
+        async with client(_auth(user_id)) as c:
+            profits = await c.get("/api/users-business-profit/")
+            founders = await c.get("/api/founders-transactions/")
+            return profits.json(), founders.json()
+
+    profits, founders = run(scenario())
+    assert profits["entries"] == [{
+        "_id": str(profit_id), "user_id": str(user_id), "amount": 40.0, "amount_minor": 4000,
+        "date": "2026-02-10", "details": "consulting", "category": "Services",
+        "created_at": "2026-01-02T03:04:05.678000", "updated_at": "2026-01-03T08:00:00",
+    }]
+    assert founders["reimbursements"] == [{
+        "_id": str(founder_id), "user_id": str(user_id), "type": "reimbursement", "amount": 7.25,
+        "amount_minor": 725, "date": "2026-02-11", "paid_by": "Utkarsh", "paid_to": "Umang",
+        "payee": "Shop", "created_at": "2026-01-02T03:04:05.678000", "updated_at": "2026-01-03T08:00:00",
+    }]
+    assert founders["salaries"] == []
@@ -0,0 +1,28 @@
+from datetime import datetime
+from bson import ObjectId
+from scripts import migrate_amounts, migrate_user_ids
+
+
+def test_migrated_ledger_rows_are_stamped_for_delta_sync(db, run):
+    user_id = ObjectId()
+    old = datetime(2020, 1, 1)
+    run(db.users_business_profit.insert_one(
+        {"user_id": str(user_id), "amount": 19.99, "date": old, "created_at": old, "updated_at": old}
+    ))
+    run(db.users_rollups.insert_one({"user_id": str(user_id), "period": "all", "units": "minor"}))
+
+    class Args:
+        dry_run = False
+        batch_size = 10
+        pause_ms = 0
+        collection = None
+        restart = False
+        rebuild_rollups = False
+
+    assert run(migrate_user_ids.main(Args)) == 0
+    assert run(migrate_amounts.main(Args)) == 0
+
+    row = run(db.users_business_profit.find_one())
+    assert (row["user_id"], row["amount_minor"]) == (user_id, 1999)
+    assert row["updated_at"] > old
+    assert "updated_at" not in run(db.users_rollups.find_one())
@@ -0,0 +1,27 @@
+from datetime import datetime
+from bson import ObjectId
+from app.utils.auth_utils import issue_token
+
+
+def test_cursor_pages_past_datetime_rows_into_legacy_string_dates(db, run, client):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    dates = [datetime(2026, 3, 1), datetime(2026, 2, 1), datetime(2026, 1, 15), "2025-12-01", "2025-11-01", None]
+    run(db.users_transactions.insert_many([
+        {"user_id": user_id, "type": "expense", "amount_minor": 100, "amount": 1.0, "date": date,
+         "created_at": now, "updated_at": now}
+        for date in dates
+    ]))
+
+    async def scenario():
+        seen, cursor = [], None
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            while True:
+                params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+                page = (await c.get("/api/users-transactions/", params=params)).json()
+                seen += [item["date"] for item in page["items"]]
+                cursor = page["next_cursor"]
+                if not cursor:
+                    return seen
+
+    assert run(scenario()) == ["2026-03-01", "2026-02-01", "2026-01-15", "2025-12-01", "2025-11-01", None]
@@ -0,0 +1,71 @@
+from datetime import datetime
+from bson import ObjectId
+from app.utils.auth_utils import issue_token
+from db_utils.rollups import rebuild_rollups
+
+
+def _legacy_profit(db, run, user_id: str):
+    # A profit and its rollup from before ObjectId user_ids and minor units
+    now = datetime.utcnow()
+    run(db.users_business_profit.insert_one({
+        "user_id": user_id, "amount": 10.5, "date": datetime(2026, 1, 5), "created_at": now, "updated_at": now
+    }))
+    run(db.users_rollups.insert_many([
+        {"user_id": user_id, "period": period, "profit_count": 1, "profit_total": 10.5}
+        for period in ("all", "2026-01")
+    ]))
+
+
+def test_write_converts_string_keyed_major_unit_rollup(db, run, client):
+    user_id = str(ObjectId())
+    _legacy_profit(db, run, user_id)
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(user_id)}"}) as c:
+            created = await c.post("/api/users-business-profit/", json={"amount": 2.25, "date": "2026-01-10"})
+            assert created.status_code == 200
+            return (await c.get("/api/users-business-profit/")).json()
+
+    profits = run(scenario())
+    assert profits["total_profit"] == 12.75
+
+    docs = run(db.users_rollups.find({"period": "all"}).to_list(None))
+    assert len(docs) == 1
+    assert docs[0]["user_id"] == ObjectId(user_id)
+    assert docs[0]["units"] == "minor"
+    assert docs[0]["profit_total"] == 1275
+
+
+def test_rebuild_replaces_both_forms_with_one_doc(db, run):
+    user_id = str(ObjectId())
+    _legacy_profit(db, run, user_id)
+    run(db.users_rollups.insert_one(
+        {"user_id": ObjectId(user_id), "period": "all", "units": "minor", "profit_count": 1, "profit_total": 225}
+    ))
+
+    run(rebuild_rollups(user_id))
+
+    docs = run(db.users_rollups.find({"period": "all"}).to_list(None))
+    assert [(doc["user_id"], doc["profit_total"]) for doc in docs] == [(ObjectId(user_id), 1050)]
+
+
+def test_rollups_are_built_on_first_read_of_an_existing_database(db, run, client):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    run(db.founders_transactions.insert_many([
+        {"user_id": user_id, "type": "investment", "payee": "Umang", "amount": 40.0, "date": datetime(2026, 1, 5),
+         "created_at": now, "updated_at": now},
+        {"user_id": user_id, "type": "salary", "payee": "Umang", "amount": 3.0, "date": datetime(2026, 1, 6),
+         "created_at": now, "updated_at": now},
+    ]))
+    run(db.users_transactions.insert_one(
+        {"user_id": user_id, "type": "expense", "payee": "Umang", "amount": 40.0, "date": datetime(2026, 1, 5),
+         "category": "x", "created_at": now, "updated_at": now}
+    ))
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            return (await c.get("/api/founders-transactions/summary")).json()
+
+    umang = run(scenario())["founders_summary"]["Umang"]
+    assert (umang["total_invested"], umang["salary_taken"], umang["net_contribution"]) == (40.0, 3.0, -37.0)
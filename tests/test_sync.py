@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.utils.auth_utils import issue_token
+
+
+def test_full_sync_pages_through_rows_older_than_tombstone_retention(db, run, client):
+    user_id = ObjectId()
+    old = datetime.utcnow() - timedelta(days=400)
+    run(db.users_business_profit.insert_many([
+        {"user_id": user_id, "amount_minor": 100 * i, "amount": i, "date": old, "created_at": old, "updated_at": old}
+        for i in range(5)
+    ]))
+
+    async def scenario():
+        pages = []
+        since = None
+        async with client({"Authorization": f"Bearer {issue_token(str(user_id))}"}) as c:
+            while True:
+                params = {"limit": 2, **({"since": since} if since else {})}
+                response = await c.get("/api/sync/", params=params)
+                assert response.status_code == 200
+                body = response.json()
+                pages.append(body["changes"]["users_business_profit"])
+                since = body["next_since"]
+                if not body["has_more"]:
+                    return pages
+
+    pages = run(scenario())
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_stale_watermark_is_rejected(db, run, client):
+    since = (datetime.utcnow() - timedelta(days=400)).isoformat()
+
+    async def scenario():
+        async with client({"Authorization": f"Bearer {issue_token(str(ObjectId()))}"}) as c:
+            return await c.get("/api/sync/", params={"since": since})
+
+    assert run(scenario()).status_code == 410